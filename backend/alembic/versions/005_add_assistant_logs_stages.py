@@ -0,0 +1,25 @@
+"""Add stages column to assistant_logs
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE assistant_logs ADD COLUMN IF NOT EXISTS stages JSONB")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE assistant_logs DROP COLUMN IF EXISTS stages")
@@ -0,0 +1,36 @@
+"""Add (user_id, created_at DESC, id DESC) indexes to log tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no puede correr dentro de una transaccion
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assistant_logs_user_id_created_at_id
+            ON assistant_logs (user_id, created_at DESC, id DESC)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_wikipedia_logs_user_id_created_at_id
+            ON wikipedia_logs (user_id, created_at DESC, id DESC)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_assistant_logs_user_id_created_at_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_wikipedia_logs_user_id_created_at_id")
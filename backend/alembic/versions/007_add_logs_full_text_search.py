@@ -0,0 +1,53 @@
+"""Add full-text search columns and GIN indexes to log tables
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Columnas generadas (STORED): PostgreSQL las mantiene en cada INSERT/UPDATE.
+    # Agregarlas reescribe la tabla, correr en ventana de mantenimiento.
+    op.execute("""
+        ALTER TABLE assistant_logs ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('spanish', coalesce(summary, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(original_text, '')), 'B')
+        ) STORED
+    """)
+    op.execute("""
+        ALTER TABLE wikipedia_logs ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('spanish', coalesce(search_term, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(summary, '')), 'B')
+        ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assistant_logs_search_vector
+            ON assistant_logs USING GIN (search_vector)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_wikipedia_logs_search_vector
+            ON wikipedia_logs USING GIN (search_vector)
+        """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_assistant_logs_search_vector")
+    op.execute("DROP INDEX IF EXISTS ix_wikipedia_logs_search_vector")
+    op.execute("ALTER TABLE assistant_logs DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE wikipedia_logs DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,108 @@
+"""Move large log texts to deduplicated, compressed text_blobs
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS text_blobs (
+            hash VARCHAR(64) PRIMARY KEY,
+            content TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+    # lz4 descomprime mucho mas rapido que pglz; si el servidor no lo soporta se queda pglz
+    op.execute("""
+        DO $$ BEGIN
+            ALTER TABLE text_blobs ALTER COLUMN content SET COMPRESSION lz4;
+        EXCEPTION WHEN feature_not_supported OR invalid_parameter_value THEN null;
+        END $$;
+    """)
+
+    # Backfill: un blob por texto distinto, y el hash en cada log
+    for table, column in (("assistant_logs", "original_text"), ("wikipedia_logs", "extracted_text")):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}_hash VARCHAR(64)")
+        op.execute(f"""
+            UPDATE {table}
+            SET {column}_hash = encode(sha256(convert_to({column}, 'UTF8')), 'hex')
+            WHERE {column}_hash IS NULL
+        """)
+        op.execute(f"""
+            INSERT INTO text_blobs (hash, content, size_bytes)
+            SELECT DISTINCT ON ({column}_hash) {column}_hash, {column}, octet_length({column})
+            FROM {table}
+            ON CONFLICT (hash) DO NOTHING
+        """)
+
+    # assistant_logs.search_vector dejaba de poder ser columna generada (el texto
+    # original ya no esta en la fila): se conservan los valores y se mantiene por trigger
+    op.execute("ALTER TABLE assistant_logs ALTER COLUMN search_vector DROP EXPRESSION")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION assistant_logs_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('spanish', coalesce(NEW.summary, '')), 'A') ||
+                setweight(to_tsvector('spanish', coalesce(
+                    (SELECT content FROM text_blobs WHERE hash = NEW.original_text_hash), ''
+                )), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER assistant_logs_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF summary, original_text_hash ON assistant_logs
+        FOR EACH ROW EXECUTE FUNCTION assistant_logs_search_vector_update()
+    """)
+
+    for table, column in (("assistant_logs", "original_text"), ("wikipedia_logs", "extracted_text")):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column}_hash SET NOT NULL")
+        op.execute(f"""
+            ALTER TABLE {table} ADD CONSTRAINT fk_{table}_{column}_hash
+            FOREIGN KEY ({column}_hash) REFERENCES text_blobs (hash)
+        """)
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_hash ON {table} ({column}_hash)")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+
+def downgrade() -> None:
+    for table, column in (("assistant_logs", "original_text"), ("wikipedia_logs", "extracted_text")):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+        op.execute(f"""
+            UPDATE {table} t SET {column} = b.content
+            FROM text_blobs b WHERE b.hash = t.{column}_hash
+        """)
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+
+    op.execute("DROP TRIGGER IF EXISTS assistant_logs_search_vector_trigger ON assistant_logs")
+    op.execute("DROP FUNCTION IF EXISTS assistant_logs_search_vector_update()")
+    op.execute("DROP INDEX IF EXISTS ix_assistant_logs_search_vector")
+    op.execute("ALTER TABLE assistant_logs DROP COLUMN search_vector")
+    op.execute("""
+        ALTER TABLE assistant_logs ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('spanish', coalesce(summary, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(original_text, '')), 'B')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX ix_assistant_logs_search_vector ON assistant_logs USING GIN (search_vector)")
+
+    for table, column in (("assistant_logs", "original_text"), ("wikipedia_logs", "extracted_text")):
+        op.execute(f"ALTER TABLE {table} DROP COLUMN {column}_hash")
+
+    op.execute("DROP TABLE IF EXISTS text_blobs")
@@ -0,0 +1,28 @@
+"""Add enqueued_at/started_at to transactions (queue wait and processing time)
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Columnas nulas sin default: no reescriben la tabla
+    op.add_column('transactions', sa.Column('enqueued_at', sa.DateTime(), nullable=True))
+    op.add_column('transactions', sa.Column('started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transactions', 'started_at')
+    op.drop_column('transactions', 'enqueued_at')
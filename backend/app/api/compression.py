@@ -0,0 +1,138 @@
+"""
+Compresion de respuestas negociada por Accept-Encoding (brotli y gzip).
+
+brotli es opcional: si el paquete no esta instalado solo se ofrece gzip.
+"""
+import gzip
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+
+# Preferencia del servidor cuando el cliente acepta varias
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# Tipos que vale la pena comprimir (las imagenes y fuentes ya vienen comprimidas)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+
+def is_compressible(media_type: Optional[str]) -> bool:
+    return bool(media_type) and media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Codificaciones aceptadas por el cliente (q > 0) del header Accept-Encoding."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(token)
+
+    if "*" in accepted:
+        accepted.update(SUPPORTED_ENCODINGS)
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str], available=SUPPORTED_ENCODINGS) -> Optional[str]:
+    """Mejor codificacion soportada y aceptada, o None para enviar sin comprimir."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in available:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Comprime con la codificacion indicada (nivel por defecto: rapido para respuestas dinamicas)."""
+    if encoding == "br":
+        return brotli.compress(body, quality=4 if level is None else level)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6 if level is None else level, mtime=0)
+    raise ValueError(f"Codificacion no soportada: {encoding}")
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime respuestas con br/gzip segun Accept-Encoding.
+
+    Solo comprime respuestas de un solo bloque (no streaming, para no
+    retrasar NDJSON), de tipos comprimibles, de al menos `minimum_size`
+    bytes y que no traigan ya Content-Encoding (p. ej. el frontend
+    precomprimido).
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                # Esperar al cuerpo para decidir si se comprime
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"))
+                or len(body) < self.minimum_size
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,11 +1,15 @@
+import math
+
 from fastapi import Header, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, SessionLocal, replicas
 from app.models.user import User
 from app.services.auth import decode_token
+from app.services import rate_limiter, job_store, recent_writes
 
 # Security scheme para Swagger UI
 security = HTTPBearer()
@@ -66,9 +70,45 @@ async def get_current_user(
             }
         )
 
+    # Las escrituras que confirme esta sesion marcan al usuario (read-your-writes)
+    db.info["user_id"] = user.id
+
     return user
 
 
+def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Dependency de sesion para endpoints de solo lectura.
+
+    Usa una replica sana (round-robin) salvo que no haya replicas o que el
+    usuario haya escrito hace menos de READ_YOUR_WRITES_SECONDS; en ese caso
+    retorna la sesion del primario de la request. Si la replica falla por
+    conexion se excluye hasta el proximo chequeo de salud.
+    """
+    replica = None
+    if replicas and not recent_writes.wrote_recently(current_user.id):
+        replica = replicas.pick()
+
+    if replica is None:
+        yield db
+        return
+
+    # Libera la conexion del primario usada para autenticar
+    db.close()
+
+    replica_db = SessionLocal(bind=replica)
+    try:
+        yield replica_db
+    except OperationalError:
+        replicas.mark_failed(replica)
+        raise
+    finally:
+        replica_db.close()
+
+
 async def verify_content_type(
     content_type: str = Header(..., description="Content-Type debe ser application/json")
 ):
@@ -82,3 +122,35 @@ async def verify_content_type(
             }
         )
     return True
+
+
+def acquire_model_budget(user_id, estimated_tokens: int):
+    """
+    Reservar presupuesto de Claude para el usuario (requests y tokens).
+    Espera brevemente si no alcanza; si sigue sin alcanzar retorna 429 con Retry-After.
+    """
+    try:
+        return rate_limiter.acquire(user_id, estimated_tokens)
+    except rate_limiter.RateLimitExceeded as e:
+        retry_after = max(1, math.ceil(e.retry_after))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "RATE_LIMITED",
+                "message": f"Limite de uso de IA excedido. Reintentar en {retry_after} segundos"
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+def get_owned_job(job_id: str, current_user: User, kinds: tuple) -> dict:
+    """Obtener un job en background del usuario actual, o 404 si no existe o es de otro usuario."""
+    job = job_store.get_job(job_id)
+
+    if not job or job["user_id"] != str(current_user.id) or job["kind"] not in kinds:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job no encontrado"
+        )
+
+    return job
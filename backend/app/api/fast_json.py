@@ -0,0 +1,27 @@
+"""
+Camino rapido de serializacion para endpoints de listado.
+
+En lugar de cargar entidades ORM y dejar que FastAPI las valide contra el
+response_model (from_attributes) y las codifique con el encoder estandar,
+los listados consultan solo las columnas del schema como tuplas y las
+codifican directo con orjson (soporta datetime y UUID de forma nativa).
+El response_model se mantiene en la ruta para la documentacion OpenAPI.
+"""
+from typing import Iterable, List, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> List:
+    """Columnas del modelo ORM con los mismos nombres que los campos del schema."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_response(rows: Iterable, headers: Optional[dict] = None) -> ORJSONResponse:
+    """
+    Respuesta JSON de una lista de filas (Row de SQLAlchemy o dicts) sin pasar
+    por la validacion del response_model.
+    """
+    content = [row if isinstance(row, dict) else row._asdict() for row in rows]
+    return ORJSONResponse(content=content, headers=headers)
@@ -0,0 +1,36 @@
+"""
+Helpers de busqueda full-text (PostgreSQL tsvector/tsquery, configuracion spanish).
+"""
+from sqlalchemy import Float, cast, func
+
+
+# Configuracion de texto usada en las columnas search_vector y en las consultas
+SEARCH_CONFIG = "spanish"
+
+HIGHLIGHT_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=\" ... \""
+
+
+def build_tsquery(q: str):
+    """Convierte la busqueda del usuario (sintaxis tipo web) a tsquery."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+
+def rank(search_vector_column, tsquery):
+    """
+    Relevancia de cada fila (ts_rank_cd, normalizada por longitud).
+
+    ts_rank_cd retorna real: se castea a double precision para que el valor
+    que viaja en el cursor (float de Python) compare exacto en el keyset; con
+    real, la fila del cursor y sus empates quedaban por encima del valor
+    ligado y se saltaban en la pagina siguiente.
+    """
+    return cast(func.ts_rank_cd(search_vector_column, tsquery, 32), Float(53))
+
+
+def highlight(text_column, tsquery):
+    """
+    Fragmentos del texto con las coincidencias entre <mark></mark>.
+    El texto se escapa como HTML antes de resaltar para que el snippet sea seguro de renderizar.
+    """
+    escaped = func.replace(func.replace(func.replace(text_column, "&", "&amp;"), "<", "&lt;"), ">", "&gt;")
+    return func.ts_headline(SEARCH_CONFIG, escaped, tsquery, HIGHLIGHT_OPTIONS)
@@ -0,0 +1,48 @@
+"""
+Validadores HTTP (ETag) y respuestas 304 Not Modified.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+# Las respuestas de la API son por usuario y se revalidan en cada uso
+API_CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    """ETag debil derivado de los valores que determinan la representacion."""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:24]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True si If-None-Match coincide con el ETag (comparacion debil, la que
+    corresponde a GET/HEAD: se ignora el prefijo W/).
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+
+    target = _opaque(etag)
+    return any(_opaque(candidate) == target for candidate in candidates)
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 si el cliente ya tiene la representacion con este ETag, si no None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=validator_headers(etag))
+    return None
+
+
+def validator_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": API_CACHE_CONTROL}
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
@@ -0,0 +1,55 @@
+"""
+Middleware ASGI de metricas HTTP y endpoint /metrics (formato Prometheus).
+"""
+import time
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+
+
+class MetricsMiddleware:
+    """
+    Mide la latencia de cada request HTTP y cuantas hay en curso.
+
+    La ruta se etiqueta con su plantilla (p. ej. /api/transactions/{transaction_id})
+    para no crear una serie por cada ID; las respuestas streaming cuentan
+    hasta que termina el cuerpo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # El router deja la ruta resuelta en el scope
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method,
+                getattr(route, "path", "unmatched"),
+                str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -0,0 +1,101 @@
+"""
+Paginacion por keyset (cursor) para listados ordenados por created_at DESC, id DESC,
+y para resultados de busqueda ordenados por rank DESC, created_at DESC, id DESC.
+
+El cursor es opaco para el cliente: base64 de los valores de ordenamiento del
+ultimo elemento de la pagina anterior separados por "|". Se devuelve en el
+header X-Next-Cursor.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    """Codifica los valores de ordenamiento de un elemento como cursor opaco."""
+    raw = "|".join(
+        value.isoformat() if isinstance(value, datetime) else str(value)
+        for value in values
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_parts(cursor: str, count: int) -> list:
+    try:
+        parts = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        parts = []
+
+    if len(parts) != count:
+        _invalid_cursor()
+    return parts
+
+
+def _invalid_cursor():
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "error": "INVALID_CURSOR",
+            "message": "Cursor de paginacion invalido"
+        }
+    )
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decodifica un cursor (created_at, id); 400 si es invalido."""
+    created_at, item_id = _decode_parts(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except ValueError:
+        _invalid_cursor()
+
+
+def decode_ranked_cursor(cursor: str) -> Tuple[float, datetime, UUID]:
+    """Decodifica un cursor (rank, created_at, id); 400 si es invalido."""
+    rank, created_at, item_id = _decode_parts(cursor, 3)
+    try:
+        return float(rank), datetime.fromisoformat(created_at), UUID(item_id)
+    except ValueError:
+        _invalid_cursor()
+
+
+def apply_keyset(query, created_at_column, id_column, cursor: Optional[str]):
+    """Filtra los elementos posteriores al cursor y ordena por (created_at, id) DESC."""
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_at_column, id_column) < (created_at, item_id))
+
+    return query.order_by(created_at_column.desc(), id_column.desc())
+
+
+def apply_ranked_keyset(query, rank_expression, created_at_column, id_column, cursor: Optional[str]):
+    """Filtra los elementos posteriores al cursor y ordena por (rank, created_at, id) DESC."""
+    if cursor:
+        rank, created_at, item_id = decode_ranked_cursor(cursor)
+        query = query.filter(
+            tuple_(rank_expression, created_at_column, id_column) < (rank, created_at, item_id)
+        )
+
+    return query.order_by(rank_expression.desc(), created_at_column.desc(), id_column.desc())
+
+
+def set_next_cursor(response: Response, rows: list, limit: int):
+    """Agrega X-Next-Cursor si la pagina esta llena (puede haber mas elementos)."""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+
+def set_next_ranked_cursor(response: Response, rows: list, limit: int):
+    """Igual que set_next_cursor para resultados ordenados por rank."""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.rank, last.created_at, last.id)
@@ -0,0 +1,194 @@
+"""
+Perfilado estadistico (pyinstrument) de requests puntuales, bajo demanda.
+
+Una request se perfila si:
+- trae `X-Profile: <PROFILING_TOKEN>` (el token vacio deshabilita el header), o
+- cae en la fraccion PROFILING_SAMPLE_RATE de las requests a /api
+
+El perfil se guarda en PROFILING_OUTPUT_DIR (HTML o JSON de speedscope, segun
+PROFILING_RENDERER) y la respuesta lleva su nombre en `X-Profile-Id`. Con
+`X-Profile-Mode: return` se descarta la respuesta del endpoint y se devuelve
+el perfil en su lugar.
+
+Los endpoints sincronos corren en el threadpool, fuera del hilo del event
+loop que ve el profiler del middleware: ProfiledRoute los envuelve para
+perfilar tambien ese hilo y las sesiones se combinan al final.
+"""
+import functools
+import hmac
+import inspect
+import logging
+import os
+import random
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.slow_queries import request_scope
+
+
+logger = logging.getLogger(__name__)
+
+# Sesiones de los hilos del threadpool de la request perfilada en curso
+_thread_sessions: ContextVar[Optional[list]] = ContextVar("profiling_thread_sessions", default=None)
+
+RENDERERS = {
+    "html": ("text/html; charset=utf-8", ".html"),
+    "speedscope": ("application/json", ".speedscope.json"),
+}
+
+
+def _new_profiler(async_mode: str):
+    from pyinstrument import Profiler
+
+    return Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode=async_mode)
+
+
+def _profile_sync_endpoint(endpoint):
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        sessions = _thread_sessions.get()
+        if sessions is None:
+            return endpoint(*args, **kwargs)
+
+        profiler = _new_profiler("disabled")
+        profiler.start()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            sessions.append(profiler.stop())
+
+    wrapper.profiled = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute que perfila el hilo del threadpool de los endpoints sincronos (route_class de los routers)."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router vuelve a crear las rutas con el endpoint ya envuelto
+        if not inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "profiled", False):
+            endpoint = _profile_sync_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _render(session) -> str:
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+
+    if settings.PROFILING_RENDERER == "speedscope":
+        return SpeedscopeRenderer().render(session)
+    return HTMLRenderer().render(session)
+
+
+def _save(profile_id: str, content: str) -> str:
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(settings.PROFILING_OUTPUT_DIR, profile_id)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def _profile_id(scope) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+    extension = RENDERERS[settings.PROFILING_RENDERER][1]
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}{extension}"
+
+
+class ProfilingMiddleware:
+    """
+    Perfila las requests que lo piden (o las muestreadas) y deja el scope de
+    cada request en `request_scope` para el log de queries lentas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _requested_mode(self, scope) -> Optional[str]:
+        """'store', 'return' o None si la request no se perfila."""
+        headers = dict(scope["headers"])
+        token = headers.get(b"x-profile")
+        if token is not None and settings.PROFILING_TOKEN \
+                and hmac.compare_digest(token, settings.PROFILING_TOKEN.encode()):
+            return "return" if headers.get(b"x-profile-mode") == b"return" else "store"
+
+        if settings.PROFILING_SAMPLE_RATE > 0 and scope["path"].startswith("/api/") \
+                and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "store"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope_token = request_scope.set(scope)
+        try:
+            mode = self._requested_mode(scope)
+            if mode is None:
+                await self.app(scope, receive, send)
+            else:
+                await self._profile(scope, receive, send, mode)
+        finally:
+            request_scope.reset(scope_token)
+
+    async def _profile(self, scope, receive, send, mode: str):
+        from pyinstrument.session import Session
+
+        status_code = 500
+        # El id se fija antes de ejecutar porque el header sale con la respuesta
+        # (la ruta todavia no esta resuelta: se usa el path)
+        profile_id = _profile_id(scope)
+
+        async def send_profiled(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if mode == "store":
+                    message.setdefault("headers", []).append((b"x-profile-id", profile_id.encode()))
+            if mode == "store":
+                await send(message)
+
+        thread_sessions = []
+        sessions_token = _thread_sessions.set(thread_sessions)
+        profiler = _new_profiler("enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            session = profiler.stop()
+            _thread_sessions.reset(sessions_token)
+
+        # Las sesiones combinadas suman duraciones: se reporta la del middleware
+        duration = session.duration
+        for thread_session in thread_sessions:
+            session = Session.combine(session, thread_session)
+        content = await run_in_threadpool(_render, session)
+
+        if mode == "return":
+            media_type = RENDERERS[settings.PROFILING_RENDERER][0]
+            body = content.encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", media_type.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profiled-status", str(status_code).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        path = await run_in_threadpool(_save, profile_id, content)
+        logger.info("Perfil guardado", extra={
+            "profile": path,
+            "route": getattr(scope.get("route"), "path", scope["path"]),
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 1),
+        })
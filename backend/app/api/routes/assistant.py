@@ -1,16 +1,38 @@
+import json
 import time
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.user import User
 from app.models.assistant_log import AssistantLog
-from app.schemas.assistant import SummarizeRequest, SummarizeResponse, AssistantLogDetailResponse
-from app.api.dependencies import get_current_user
-from app.services.claude_client import ClaudeClient
+from app.models.text_blob import TextBlob
+from app.schemas.assistant import (
+    SummarizeRequest,
+    SummarizeResponse,
+    AssistantLogResponse,
+    AssistantLogDetailResponse,
+    AssistantSearchResult,
+    BatchSummarizeRequest,
+)
+from app.schemas.job import JobAcceptedResponse, JobStatusResponse
+from app.api.dependencies import get_current_user, get_read_db, acquire_model_budget, get_owned_job
+from app.api.fast_json import rows_response
+from app.api.pagination import apply_keyset, set_next_cursor, apply_ranked_keyset, set_next_ranked_cursor
+from app.api import full_text
+from app.services.claude_client import ClaudeClient, resolve_mode
+from app.services import job_store, rate_limiter, singleflight, summary_cache
+from app.services.text_blobs import store_text
+from app.api.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/assistant", tags=["assistant"])
+router = APIRouter(prefix="/assistant", tags=["assistant"], route_class=ProfiledRoute)
+
+# Caracteres del texto original que se muestran en el historial
+PREVIEW_LENGTH = 100
 
 
 @router.post("/summarize", response_model=SummarizeResponse, status_code=status.HTTP_201_CREATED)
@@ -24,38 +46,71 @@ def summarize_text(
 
     - Requiere autenticacion JWT
     - Envia el texto a la API de Claude (Anthropic)
+    - Textos largos (mode auto/map_reduce) se resumen por bloques en paralelo
+    - Resumenes de una llamada cacheados por texto; textos identicos simultaneos
+      comparten una sola llamada
     - Guarda el registro en la base de datos
     - Retorna el resumen generado
+    - Sujeto a limite de uso por usuario y global (429 con Retry-After)
     """
     start_time = time.time()
 
-    try:
-        # Llamar a Claude API
-        claude = ClaudeClient()
-        result = claude.summarize(
-            text=request.text,
-            max_tokens=request.max_tokens
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={
-                "error": "CLAUDE_API_ERROR",
-                "message": f"Error al comunicarse con Claude API: {str(e)}"
-            }
+    # Cacheado por texto y coalescido: requests simultaneas con el mismo texto
+    # esperan y comparten una sola llamada. El resumen de una llamada es el mismo
+    # que guarda /wikipedia/search; map_reduce (con sus etapas) solo se coalesce
+    mode = resolve_mode(request.text, request.mode)
+    key = summary_cache.cache_key(request.text, request.max_tokens)
+    if mode == "map_reduce":
+        key += ":map_reduce"
+
+    def summarize() -> dict:
+        if mode == "single":
+            cached = summary_cache.get(request.text, request.max_tokens)
+            if cached is not None:
+                return cached
+
+        reservation = acquire_model_budget(
+            current_user.id,
+            rate_limiter.estimate_tokens(request.text, request.max_tokens)
         )
 
+        try:
+            # Llamar a Claude API
+            claude = ClaudeClient()
+            result = claude.summarize_with_mode(
+                text=request.text,
+                max_tokens=request.max_tokens,
+                mode=mode
+            )
+        except Exception as e:
+            rate_limiter.reconcile(reservation, 0)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail={
+                    "error": "CLAUDE_API_ERROR",
+                    "message": f"Error al comunicarse con Claude API: {str(e)}"
+                }
+            )
+
+        rate_limiter.reconcile(reservation, rate_limiter.result_tokens(result))
+        if mode == "single":
+            summary_cache.put(request.text, request.max_tokens, result)
+        return result
+
+    result = singleflight.run(key, summarize)
+
     processing_time = int((time.time() - start_time) * 1000)
 
     # Guardar en BD
     log_entry = AssistantLog(
         user_id=current_user.id,
-        original_text=request.text,
+        original_text_hash=store_text(db, request.text),
         summary=result["summary"],
         model_used=result["model"],
         tokens_input=result.get("tokens_input"),
         tokens_output=result.get("tokens_output"),
-        processing_time_ms=processing_time
+        processing_time_ms=processing_time,
+        stages=result.get("stages")
     )
 
     db.add(log_entry)
@@ -65,32 +120,326 @@ def summarize_text(
     return log_entry
 
 
-@router.get("/history", response_model=List[AssistantLogDetailResponse])
+@router.post("/summarize/stream")
+def summarize_text_stream(
+    request: SummarizeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generar un resumen de texto en streaming (NDJSON).
+
+    - Requiere autenticacion JWT
+    - Emite una linea {"type": "delta", "text": ...} por cada fragmento de Claude
+    - Al terminar guarda el registro en la base de datos y emite
+      {"type": "done", "data": SummarizeResponse}
+    - Si Claude falla a mitad del stream emite {"type": "error", ...}
+    - Si el cliente se desconecta se reconcilia el limite con lo consumido
+    - Siempre usa una sola llamada (el campo mode no aplica)
+    - Sujeto a limite de uso por usuario y global (429 con Retry-After)
+    """
+    user_id = current_user.id
+    reservation = acquire_model_budget(
+        user_id,
+        rate_limiter.estimate_tokens(request.text, request.max_tokens)
+    )
+    claude = ClaudeClient()
+
+    def event_stream():
+        start_time = time.time()
+        result = None
+        streamed_chars = 0
+        reconciled = False
+
+        try:
+            try:
+                for event in claude.summarize_stream(
+                    text=request.text,
+                    max_tokens=request.max_tokens
+                ):
+                    if event["type"] == "delta":
+                        streamed_chars += len(event["text"])
+                        yield _ndjson({"type": "delta", "text": event["text"]})
+                    else:
+                        result = event
+            except Exception as e:
+                rate_limiter.reconcile(reservation, 0)
+                reconciled = True
+                yield _ndjson({
+                    "type": "error",
+                    "error": "CLAUDE_API_ERROR",
+                    "message": f"Error al comunicarse con Claude API: {str(e)}"
+                })
+                return
+
+            rate_limiter.reconcile(reservation, rate_limiter.result_tokens(result))
+            reconciled = True
+        finally:
+            if not reconciled:
+                # El cliente corto el stream (GeneratorExit, que no es Exception):
+                # se cobra lo consumido hasta ahora, estimado, y no la reserva completa
+                consumed = 0
+                if streamed_chars:
+                    consumed = rate_limiter.estimate_tokens(request.text, 0) + streamed_chars // 4
+                rate_limiter.reconcile(reservation, consumed)
+
+        processing_time = int((time.time() - start_time) * 1000)
+
+        # La sesion del request ya se cerro; abrir una propia para el guardado final
+        db = SessionLocal()
+        # Fuera de get_current_user: marcar al usuario para read-your-writes
+        db.info["user_id"] = user_id
+        try:
+            log_entry = AssistantLog(
+                user_id=user_id,
+                original_text_hash=store_text(db, request.text),
+                summary=result["summary"],
+                model_used=result["model"],
+                tokens_input=result.get("tokens_input"),
+                tokens_output=result.get("tokens_output"),
+                processing_time_ms=processing_time
+            )
+            db.add(log_entry)
+            db.commit()
+            db.refresh(log_entry)
+
+            yield _ndjson({
+                "type": "done",
+                "data": SummarizeResponse.model_validate(log_entry).model_dump(mode="json")
+            })
+        except Exception as e:
+            db.rollback()
+            yield _ndjson({
+                "type": "error",
+                "error": "DATABASE_ERROR",
+                "message": f"Error al guardar el resumen: {str(e)}"
+            })
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _ndjson(payload: dict) -> str:
+    """Serializa un evento como una linea NDJSON."""
+    return json.dumps(payload, ensure_ascii=False) + "\n"
+
+
+@router.post("/summarize/async", response_model=JobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
+def summarize_text_async(
+    request: SummarizeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generar un resumen en background (cola de Celery "ai").
+
+    - Requiere autenticacion JWT
+    - Retorna 202 con el job_id inmediatamente
+    - Resultado en GET /assistant/jobs/{job_id} y via WebSocket con el
+      evento AI_JOB_COMPLETED (solo id, kind y status)
+    """
+    # Importar aqui para evitar imports circulares
+    from app.celery_app.tasks import summarize_job_task
+
+    job_id = job_store.create_job(kind="summarize", user_id=current_user.id, total=1)
+
+    summarize_job_task.delay(
+        job_id,
+        str(current_user.id),
+        request.text,
+        request.max_tokens,
+        request.mode
+    )
+
+    return JobAcceptedResponse(
+        job_id=job_id,
+        status="pendiente",
+        total=1,
+        message="Resumen encolado para procesamiento asincrono"
+    )
+
+
+@router.post("/summarize/batch", response_model=JobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
+def summarize_batch(
+    request: BatchSummarizeRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Encolar un lote de textos para resumir en background.
+
+    - Requiere autenticacion JWT
+    - Retorna 202 con el job_id inmediatamente
+    - El worker resume con concurrencia acotada e inserta los registros en bloque
+    - Progreso en GET /assistant/jobs/{job_id}; al terminar se notifica
+      via WebSocket con el evento BATCH_SUMMARY_COMPLETED
+    """
+    # Importar aqui para evitar imports circulares
+    from app.celery_app.tasks import summarize_batch_task
+
+    job_id = job_store.create_job(
+        kind="summarize_batch",
+        user_id=current_user.id,
+        total=len(request.texts)
+    )
+
+    summarize_batch_task.delay(
+        job_id,
+        str(current_user.id),
+        request.texts,
+        request.max_tokens
+    )
+
+    return JobAcceptedResponse(
+        job_id=job_id,
+        status="pendiente",
+        total=len(request.texts),
+        message="Lote encolado para procesamiento asincrono"
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Obtener el progreso y resultados de un job de resumen del usuario actual.
+    """
+    return get_owned_job(job_id, current_user, kinds=("summarize", "summarize_batch"))
+
+
+@router.get("/history", response_model=List[AssistantLogResponse])
 def get_summary_history(
     skip: int = 0,
-    limit: int = 20,
-    db: Session = Depends(get_db),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Obtener historial de resumenes del usuario actual.
-    Incluye texto original completo para vista expandida.
+
+    - Solo trae columnas livianas: el preview del texto original se recorta
+      en la base de datos (left(text_blobs.content, 101))
+    - Lee de una replica si hay (ver get_read_db)
+    - Paginacion por keyset: enviar el header X-Next-Cursor de la respuesta
+      anterior como ?cursor= (skip se mantiene por compatibilidad)
+    - Texto original completo en GET /assistant/history/{log_id}
     """
-    logs = db.query(AssistantLog)\
-        .filter(AssistantLog.user_id == current_user.id)\
-        .order_by(AssistantLog.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    query = db.query(
+        AssistantLog.id,
+        AssistantLog.summary,
+        func.left(TextBlob.content, PREVIEW_LENGTH + 1).label("original_text_head"),
+        AssistantLog.model_used,
+        AssistantLog.created_at
+    ).join(TextBlob, TextBlob.hash == AssistantLog.original_text_hash)\
+        .filter(AssistantLog.user_id == current_user.id)
 
-    return [
+    query = apply_keyset(query, AssistantLog.created_at, AssistantLog.id, cursor)
+    if not cursor:
+        query = query.offset(skip)
+
+    rows = query.limit(limit).all()
+
+    # Filas ya proyectadas: se serializan con orjson sin validar el response_model
+    fast_response = rows_response([
         {
-            "id": log.id,
-            "summary": log.summary,
-            "original_text_preview": log.original_text[:100] + "..." if len(log.original_text) > 100 else log.original_text,
-            "original_text": log.original_text,  # Texto completo para vista expandida
-            "model_used": log.model_used,
-            "created_at": log.created_at
+            "id": row.id,
+            "summary": row.summary,
+            "original_text_preview": _preview(row.original_text_head),
+            "model_used": row.model_used,
+            "created_at": row.created_at
         }
-        for log in logs
-    ]
+        for row in rows
+    ])
+    set_next_cursor(fast_response, rows, limit)
+
+    return fast_response
+
+
+@router.get("/search", response_model=List[AssistantSearchResult])
+def search_summary_history(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar (admite \"frase\", OR y -exclusion)"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Buscar en el historial de resumenes del usuario actual (full-text, espanol).
+
+    - Usa la columna search_vector (mantenida por trigger) con indice GIN
+    - Ordena por relevancia (resumen pesa mas que el texto original)
+    - Retorna fragmentos con las coincidencias entre <mark></mark>
+    - Paginacion por keyset con el header X-Next-Cursor
+    """
+    tsquery = full_text.build_tsquery(q)
+    rank = full_text.rank(AssistantLog.search_vector, tsquery)
+
+    # Primero se pagina solo con (id, rank, created_at); los snippets se calculan
+    # unicamente para las filas de la pagina
+    page = db.query(
+        AssistantLog.id,
+        AssistantLog.created_at,
+        rank.label("rank")
+    ).filter(
+        AssistantLog.user_id == current_user.id,
+        AssistantLog.search_vector.op("@@")(tsquery)
+    )
+    page = apply_ranked_keyset(page, rank, AssistantLog.created_at, AssistantLog.id, cursor)
+    page = page.limit(limit).subquery()
+
+    rows = db.query(
+        page.c.id,
+        page.c.rank,
+        page.c.created_at,
+        full_text.highlight(AssistantLog.summary, tsquery).label("summary_highlight"),
+        full_text.highlight(TextBlob.content, tsquery).label("original_text_highlight"),
+        AssistantLog.model_used
+    ).join(AssistantLog, AssistantLog.id == page.c.id)\
+        .join(TextBlob, TextBlob.hash == AssistantLog.original_text_hash)\
+        .order_by(page.c.rank.desc(), page.c.created_at.desc(), page.c.id.desc())\
+        .all()
+
+    set_next_ranked_cursor(response, rows, limit)
+
+    return [row._asdict() for row in rows]
+
+
+@router.get("/history/{log_id}", response_model=AssistantLogDetailResponse)
+def get_summary_detail(
+    log_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Obtener un resumen del historial con el texto original completo.
+    """
+    log = db.query(AssistantLog).options(joinedload(AssistantLog.original_text_blob)).filter(
+        AssistantLog.id == log_id,
+        AssistantLog.user_id == current_user.id
+    ).first()
+
+    if not log:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resumen no encontrado"
+        )
+
+    return {
+        "id": log.id,
+        "summary": log.summary,
+        "original_text_preview": _preview(log.original_text),
+        "original_text": log.original_text,
+        "model_used": log.model_used,
+        "created_at": log.created_at
+    }
+
+
+def _preview(text: str) -> str:
+    """Recorta el texto a PREVIEW_LENGTH caracteres con '...' si es mas largo."""
+    return text[:PREVIEW_LENGTH] + "..." if len(text) > PREVIEW_LENGTH else text
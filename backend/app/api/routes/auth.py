@@ -6,8 +6,9 @@ from app.models.user import User
 from app.schemas.auth import UserLogin, UserResponse, Token
 from app.services.auth import authenticate_user, create_access_token
 from app.api.dependencies import get_current_user
+from app.api.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=ProfiledRoute)
 
 
 @router.post("/login", response_model=Token)
@@ -1,18 +1,24 @@
 import hashlib
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.database import get_db
+from app.database import get_db, SessionLocal, is_replica_session
 from app.models.transaction import Transaction
 from app.models.user import User
 from app.schemas.transaction import TransactionCreate, TransactionResponse, AsyncProcessResponse, TransactionStatus
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, get_read_db
+from app.api.fast_json import schema_columns, rows_response
+from app.api.http_cache import weak_etag, not_modified, validator_headers
+from app.tracing import get_tracer
+from app.api.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/transactions", tags=["transactions"])
+router = APIRouter(prefix="/transactions", tags=["transactions"], route_class=ProfiledRoute)
 
 
 def generate_idempotency_key(user_id: str, monto: float, tipo: str) -> str:
@@ -93,6 +99,8 @@ def async_process_transaction(
     - Encola una tarea en Celery para procesamiento.
     - El worker simula un banco externo (sleep) y actualiza el status.
     - Notifica cambios via WebSocket.
+    - El span de la request es el padre de la traza que sigue en el worker
+      y en el broadcast; enqueued_at marca el inicio de la espera en cola.
     """
     # Importar aqui para evitar imports circulares
     from app.celery_app.tasks import process_transaction_task
@@ -139,13 +147,22 @@ def async_process_transaction(
             detail="Transaccion duplicada (race condition detectada)"
         )
 
-    # Encolar tarea en Celery
-    task = process_transaction_task.delay(str(new_transaction.id))
+    transaction_id = str(new_transaction.id)
+    with get_tracer().start_as_current_span("transactions.enqueue") as span:
+        span.set_attribute("transaction.id", transaction_id)
 
-    # Actualizar con el task_id de Celery
-    new_transaction.celery_task_id = task.id
-    db.commit()
-    db.refresh(new_transaction)
+        # enqueued_at se confirma antes de publicar: un worker rapido podria
+        # leer la fila antes del commit siguiente y no medir la espera en cola
+        new_transaction.enqueued_at = datetime.utcnow()
+        db.commit()
+
+        # Encolar tarea en Celery (el contexto de la traza va en los headers)
+        task = process_transaction_task.delay(transaction_id)
+
+        # Actualizar con el task_id de Celery
+        new_transaction.celery_task_id = task.id
+        db.commit()
+        db.refresh(new_transaction)
 
     return AsyncProcessResponse(
         transaction_id=new_transaction.id,
@@ -157,45 +174,86 @@ def async_process_transaction(
 
 @router.get("/", response_model=List[TransactionResponse])
 def list_transactions(
+    request: Request,
     user_id: Optional[str] = None,
     tx_status: Optional[TransactionStatus] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Listar transacciones con filtros opcionales.
-    Requiere autenticacion JWT.
-    """
-    query = db.query(Transaction)
+    Requiere autenticacion JWT. Lee de una replica si hay (ver get_read_db).
 
+    - Consulta solo las columnas de TransactionResponse como tuplas y las
+      serializa con orjson (sin validacion del response_model)
+    - ETag debil derivado del filtro, la pagina, el max(updated_at) y el
+      conteo de las transacciones filtradas; con If-None-Match responde 304
+      sin consultar ni serializar la pagina
+    """
+    filters = []
     if user_id:
-        query = query.filter(Transaction.user_id == user_id)
+        filters.append(Transaction.user_id == user_id)
     if tx_status:
-        query = query.filter(Transaction.status == tx_status.value)
+        filters.append(Transaction.status == tx_status.value)
+
+    # count(*) ademas del max: una fila que sale del filtro (p. ej. pendiente ->
+    # procesado) no cambia el max de las que quedan, pero si el conteo
+    last_updated_at, total = db.query(func.max(Transaction.updated_at), func.count())\
+        .select_from(Transaction).filter(*filters).one()
+    etag = weak_etag("transactions", user_id, tx_status.value if tx_status else None, skip, limit, last_updated_at, total)
+
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    rows = db.query(*schema_columns(Transaction, TransactionResponse))\
+        .filter(*filters)\
+        .order_by(Transaction.created_at.desc())\
+        .offset(skip)\
+        .limit(limit)\
+        .all()
 
-    return query.order_by(Transaction.created_at.desc()).offset(skip).limit(limit).all()
+    return rows_response(rows, headers=validator_headers(etag))
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 def get_transaction(
     transaction_id: UUID,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Obtener una transaccion por ID.
     Requiere autenticacion JWT.
+
+    ETag debil derivado de updated_at; con If-None-Match responde 304 sin serializar.
+    Lee de una replica si hay; si la replica no la tiene (todavia no replico
+    una transaccion recien creada) se busca en el primario.
     """
     transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id
     ).first()
 
+    if not transaction and is_replica_session(db):
+        with SessionLocal() as primary_db:
+            transaction = primary_db.query(Transaction).filter(
+                Transaction.id == transaction_id
+            ).first()
+
     if not transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaccion no encontrada"
         )
 
+    etag = weak_etag("transaction", transaction.id, transaction.updated_at)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    response.headers.update(validator_headers(etag))
     return transaction
@@ -1,17 +1,46 @@
+import json
+import threading
 import time
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
+from uuid import UUID
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, SessionLocal
 from app.models.user import User
 from app.models.wikipedia_log import WikipediaLog
-from app.schemas.wikipedia import WikipediaSearchRequest, WikipediaSearchResponse, WikipediaHistoryResponse
-from app.api.dependencies import get_current_user
+from app.models.text_blob import TextBlob
+from app.schemas.wikipedia import (
+    WikipediaSearchRequest,
+    BatchWikipediaSearchRequest,
+    WikipediaSearchResponse,
+    WikipediaHistoryItemResponse,
+    WikipediaHistoryResponse,
+    WikipediaSearchHistoryResult,
+)
+from app.schemas.job import JobAcceptedResponse, JobStatusResponse
+from app.api.dependencies import get_current_user, get_read_db, acquire_model_budget, get_owned_job
+from app.api.fast_json import rows_response
+from app.api.pagination import apply_keyset, set_next_cursor, apply_ranked_keyset, set_next_ranked_cursor
+from app.api import full_text
 from app.services.wikipedia_scraper import WikipediaScraper
+from app.services.wikipedia_http import ArticleNotFoundError
+from app.services.webdriver_pool import WebDriverPoolTimeout
 from app.services.claude_client import ClaudeClient
+from app.services import rate_limiter, job_store, singleflight, summary_cache, wikipedia_cache
+from app.services.text_blobs import store_text, store_texts
+from app.api.profiling import ProfiledRoute
 
-router = APIRouter(prefix="/wikipedia", tags=["wikipedia"])
+router = APIRouter(prefix="/wikipedia", tags=["wikipedia"], route_class=ProfiledRoute)
+
+# Caracteres del texto extraido que se muestran en el historial
+PREVIEW_LENGTH = 100
 
 
 @router.post("/search", response_model=WikipediaSearchResponse, status_code=status.HTTP_201_CREATED)
@@ -24,16 +53,31 @@ def wikipedia_search(
     Buscar en Wikipedia, extraer primer parrafo y generar resumen con IA.
 
     - Requiere autenticacion JWT
-    - Usa Selenium headless para scraping de Wikipedia
+    - Extrae el articulo por HTTP (API de MediaWiki); Selenium headless solo como respaldo
     - Llama a Claude API para generar resumen
+    - Articulos y resumenes se cachean en Redis: una busqueda repetida no usa
+      navegador ni Claude
     - Guarda el registro en la base de datos
     """
     start_time = time.time()
 
-    # 1. Extraer texto de Wikipedia
+    # 1. Extraer texto de Wikipedia (cacheado por termino; busquedas simultaneas
+    #    del mismo termino comparten una sola extraccion)
     try:
         scraper = WikipediaScraper()
-        wiki_result = scraper.search_and_extract(request.search_term)
+        wiki_result = singleflight.run(
+            wikipedia_cache.cache_key(request.search_term),
+            lambda: wikipedia_cache.get_article(request.search_term, scraper.search_and_extract)
+        )
+    except WebDriverPoolTimeout as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "SCRAPER_BUSY",
+                "message": str(e)
+            },
+            headers={"Retry-After": str(max(1, round(e.timeout)))}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,22 +90,40 @@ def wikipedia_search(
     extracted_text = wiki_result["text"]
     wikipedia_url = wiki_result["url"]
 
-    # 2. Generar resumen con Claude
-    try:
-        claude = ClaudeClient()
-        summary_result = claude.summarize(
-            text=extracted_text,
-            max_tokens=request.max_tokens
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail={
-                "error": "CLAUDE_API_ERROR",
-                "message": f"Error al generar resumen con Claude: {str(e)}"
-            }
+    # 2. Generar resumen con Claude (cacheado por texto; sujeto a limite de uso).
+    #    Requests simultaneas con el mismo texto esperan y comparten una sola llamada
+    def summarize() -> dict:
+        cached = summary_cache.get(extracted_text, request.max_tokens)
+        if cached is not None:
+            return cached
+
+        reservation = acquire_model_budget(
+            current_user.id,
+            rate_limiter.estimate_tokens(extracted_text, request.max_tokens)
         )
 
+        try:
+            claude = ClaudeClient()
+            result = claude.summarize(
+                text=extracted_text,
+                max_tokens=request.max_tokens
+            )
+        except Exception as e:
+            rate_limiter.reconcile(reservation, 0)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail={
+                    "error": "CLAUDE_API_ERROR",
+                    "message": f"Error al generar resumen con Claude: {str(e)}"
+                }
+            )
+
+        rate_limiter.reconcile(reservation, rate_limiter.result_tokens(result))
+        summary_cache.put(extracted_text, request.max_tokens, result)
+        return result
+
+    summary_result = singleflight.run(summary_cache.cache_key(extracted_text, request.max_tokens), summarize)
+
     processing_time = int((time.time() - start_time) * 1000)
 
     # 3. Guardar en BD
@@ -69,7 +131,7 @@ def wikipedia_search(
         user_id=current_user.id,
         search_term=request.search_term,
         wikipedia_url=wikipedia_url,
-        extracted_text=extracted_text,
+        extracted_text_hash=store_text(db, extracted_text),
         summary=summary_result["summary"],
         model_used=summary_result["model"],
         processing_time_ms=processing_time
@@ -82,21 +144,369 @@ def wikipedia_search(
     return log_entry
 
 
-@router.get("/history", response_model=List[WikipediaHistoryResponse])
+@router.post("/search/async", response_model=JobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
+def wikipedia_search_async(
+    request: WikipediaSearchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Buscar en Wikipedia y resumir en background (cola de Celery "ai").
+
+    - Requiere autenticacion JWT
+    - Retorna 202 con el job_id inmediatamente
+    - Resultado en GET /wikipedia/jobs/{job_id} y via WebSocket con el
+      evento AI_JOB_COMPLETED (solo id, kind y status)
+    """
+    # Importar aqui para evitar imports circulares
+    from app.celery_app.tasks import wikipedia_search_job_task
+
+    job_id = job_store.create_job(kind="wikipedia_search", user_id=current_user.id, total=1)
+
+    wikipedia_search_job_task.delay(
+        job_id,
+        str(current_user.id),
+        request.search_term,
+        request.max_tokens
+    )
+
+    return JobAcceptedResponse(
+        job_id=job_id,
+        status="pendiente",
+        total=1,
+        message="Busqueda encolada para procesamiento asincrono"
+    )
+
+
+@router.post("/search/batch")
+def wikipedia_search_batch(
+    request: BatchWikipediaSearchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Buscar y resumir un lote de terminos en Wikipedia (streaming NDJSON).
+
+    - Requiere autenticacion JWT
+    - Extrae los articulos en paralelo (WIKIPEDIA_BATCH_EXTRACT_CONCURRENCY) y
+      resume con concurrencia acotada (WIKIPEDIA_BATCH_SUMMARIZE_CONCURRENCY)
+    - Emite una linea por termino en cuanto termina, en orden de llegada:
+      {"type": "result", "index", "search_term", "data"} (sin id) o
+      {"type": "error", "index", "search_term", "error", "message"}
+    - Los registros se insertan en bloques de BATCH_INSERT_SIZE; al confirmar
+      un bloque se emite {"type": "saved", "items": [{"index", "id"}]} y si
+      falla {"type": "error", "error": "DATABASE_ERROR", "indexes"}
+    - Termina con {"type": "done", "total", "completed", "failed"}
+    - Los resumenes esperan el presupuesto de uso del usuario en lugar de fallar
+    """
+    user_id = current_user.id
+    terms = request.search_terms
+    max_tokens = request.max_tokens
+    summarize_slots = threading.BoundedSemaphore(settings.WIKIPEDIA_BATCH_SUMMARIZE_CONCURRENCY)
+
+    def process(search_term: str) -> dict:
+        start_time = time.time()
+        scraper = WikipediaScraper()
+        article = singleflight.run(
+            wikipedia_cache.cache_key(search_term),
+            lambda: wikipedia_cache.get_article(search_term, scraper.search_and_extract)
+        )
+
+        def summarize() -> dict:
+            cached = summary_cache.get(article["text"], max_tokens)
+            if cached is not None:
+                return cached
+
+            with summarize_slots:
+                reservation = rate_limiter.acquire(
+                    user_id,
+                    rate_limiter.estimate_tokens(article["text"], max_tokens),
+                    max_wait=-1
+                )
+                try:
+                    result = ClaudeClient().summarize(text=article["text"], max_tokens=max_tokens)
+                except Exception as e:
+                    rate_limiter.reconcile(reservation, 0)
+                    raise _BatchItemError("CLAUDE_API_ERROR", f"Error al generar resumen con Claude: {str(e)}")
+                rate_limiter.reconcile(reservation, rate_limiter.result_tokens(result))
+
+            summary_cache.put(article["text"], max_tokens, result)
+            return result
+
+        summary_result = singleflight.run(summary_cache.cache_key(article["text"], max_tokens), summarize)
+
+        return {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "search_term": search_term,
+            "wikipedia_url": article["url"],
+            "extracted_text": article["text"],
+            "summary": summary_result["summary"],
+            "model_used": summary_result["model"],
+            "processing_time_ms": int((time.time() - start_time) * 1000),
+            "created_at": datetime.utcnow()
+        }
+
+    def event_stream():
+        completed = 0
+        failed = 0
+        pending_rows = []
+        pending_indexes = []
+
+        db = SessionLocal()
+        # Fuera de get_current_user: marcar al usuario para read-your-writes
+        db.info["user_id"] = user_id
+        executor = ThreadPoolExecutor(max_workers=settings.WIKIPEDIA_BATCH_EXTRACT_CONCURRENCY)
+
+        def flush():
+            # Textos (deduplicados) y filas del bloque en un executemany cada uno
+            nonlocal completed, failed
+            if not pending_rows:
+                return None
+            try:
+                hashes = store_texts(db, [row.pop("extracted_text") for row in pending_rows])
+                for row, digest in zip(pending_rows, hashes):
+                    row["extracted_text_hash"] = digest
+                db.execute(insert(WikipediaLog), pending_rows)
+                db.commit()
+                completed += len(pending_rows)
+                # Los ids solo se publican cuando las filas ya existen
+                line = _ndjson({
+                    "type": "saved",
+                    "items": [
+                        {"index": index, "id": str(row["id"])}
+                        for index, row in zip(pending_indexes, pending_rows)
+                    ]
+                })
+            except Exception as e:
+                db.rollback()
+                failed += len(pending_rows)
+                line = _ndjson({
+                    "type": "error",
+                    "error": "DATABASE_ERROR",
+                    "message": f"Error al guardar resultados: {str(e)}",
+                    "indexes": list(pending_indexes)
+                })
+            pending_rows.clear()
+            pending_indexes.clear()
+            return line
+
+        try:
+            futures = {executor.submit(process, term): index for index, term in enumerate(terms)}
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    failed += 1
+                    error, message = _batch_error(e)
+                    yield _ndjson({
+                        "type": "error",
+                        "index": index,
+                        "search_term": terms[index],
+                        "error": error,
+                        "message": message
+                    })
+                    continue
+
+                yield _ndjson({
+                    "type": "result",
+                    "index": index,
+                    "search_term": terms[index],
+                    "data": {
+                        "search_term": row["search_term"],
+                        "wikipedia_url": row["wikipedia_url"],
+                        "summary": row["summary"],
+                        "model_used": row["model_used"],
+                        "processing_time_ms": row["processing_time_ms"],
+                        "created_at": row["created_at"].isoformat()
+                    }
+                })
+                pending_rows.append(row)
+                pending_indexes.append(index)
+
+                if len(pending_rows) >= settings.BATCH_INSERT_SIZE:
+                    line = flush()
+                    if line:
+                        yield line
+
+            line = flush()
+            if line:
+                yield line
+
+            yield _ndjson({"type": "done", "total": len(terms), "completed": completed, "failed": failed})
+        finally:
+            # Si el cliente se desconecta no seguir extrayendo terminos pendientes
+            executor.shutdown(wait=False, cancel_futures=True)
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Obtener el progreso y resultado de una busqueda async del usuario actual.
+    """
+    return get_owned_job(job_id, current_user, kinds=("wikipedia_search",))
+
+
+@router.get("/history", response_model=List[WikipediaHistoryItemResponse])
 def get_wikipedia_history(
     skip: int = 0,
-    limit: int = 20,
-    db: Session = Depends(get_db),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Obtener historial de busquedas Wikipedia del usuario actual.
+
+    - Solo trae columnas livianas: el preview del texto extraido se recorta
+      en la base de datos (left(text_blobs.content, 101))
+    - Lee de una replica si hay (ver get_read_db)
+    - Paginacion por keyset: enviar el header X-Next-Cursor de la respuesta
+      anterior como ?cursor= (skip se mantiene por compatibilidad)
+    - Texto extraido completo en GET /wikipedia/history/{log_id}
+    """
+    query = db.query(
+        WikipediaLog.id,
+        WikipediaLog.search_term,
+        WikipediaLog.wikipedia_url,
+        func.left(TextBlob.content, PREVIEW_LENGTH + 1).label("extracted_text_head"),
+        WikipediaLog.summary,
+        WikipediaLog.model_used,
+        WikipediaLog.created_at
+    ).join(TextBlob, TextBlob.hash == WikipediaLog.extracted_text_hash)\
+        .filter(WikipediaLog.user_id == current_user.id)
+
+    query = apply_keyset(query, WikipediaLog.created_at, WikipediaLog.id, cursor)
+    if not cursor:
+        query = query.offset(skip)
+
+    rows = query.limit(limit).all()
+
+    # Filas ya proyectadas: se serializan con orjson sin validar el response_model
+    fast_response = rows_response([
+        {
+            "id": row.id,
+            "search_term": row.search_term,
+            "wikipedia_url": row.wikipedia_url,
+            "extracted_text_preview": _preview(row.extracted_text_head),
+            "summary": row.summary,
+            "model_used": row.model_used,
+            "created_at": row.created_at
+        }
+        for row in rows
+    ])
+    set_next_cursor(fast_response, rows, limit)
+
+    return fast_response
+
+
+@router.get("/search-history", response_model=List[WikipediaSearchHistoryResult])
+def search_wikipedia_history(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar (admite \"frase\", OR y -exclusion)"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Buscar en el historial de Wikipedia del usuario actual (full-text, espanol).
+
+    - Usa la columna generada search_vector con indice GIN
+    - Ordena por relevancia (termino buscado pesa mas que el resumen)
+    - Retorna fragmentos del resumen con las coincidencias entre <mark></mark>
+    - Paginacion por keyset con el header X-Next-Cursor
     """
-    logs = db.query(WikipediaLog)\
-        .filter(WikipediaLog.user_id == current_user.id)\
-        .order_by(WikipediaLog.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
+    tsquery = full_text.build_tsquery(q)
+    rank = full_text.rank(WikipediaLog.search_vector, tsquery)
+
+    # Primero se pagina solo con (id, rank, created_at); los snippets se calculan
+    # unicamente para las filas de la pagina
+    page = db.query(
+        WikipediaLog.id,
+        WikipediaLog.created_at,
+        rank.label("rank")
+    ).filter(
+        WikipediaLog.user_id == current_user.id,
+        WikipediaLog.search_vector.op("@@")(tsquery)
+    )
+    page = apply_ranked_keyset(page, rank, WikipediaLog.created_at, WikipediaLog.id, cursor)
+    page = page.limit(limit).subquery()
+
+    rows = db.query(
+        page.c.id,
+        page.c.rank,
+        page.c.created_at,
+        WikipediaLog.search_term,
+        WikipediaLog.wikipedia_url,
+        full_text.highlight(WikipediaLog.summary, tsquery).label("summary_highlight"),
+        WikipediaLog.model_used
+    ).join(WikipediaLog, WikipediaLog.id == page.c.id)\
+        .order_by(page.c.rank.desc(), page.c.created_at.desc(), page.c.id.desc())\
         .all()
 
-    return logs
+    set_next_ranked_cursor(response, rows, limit)
+
+    return [row._asdict() for row in rows]
+
+
+@router.get("/history/{log_id}", response_model=WikipediaHistoryResponse)
+def get_wikipedia_detail(
+    log_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Obtener una busqueda del historial con el texto extraido completo.
+    """
+    log = db.query(WikipediaLog).options(joinedload(WikipediaLog.extracted_text_blob)).filter(
+        WikipediaLog.id == log_id,
+        WikipediaLog.user_id == current_user.id
+    ).first()
+
+    if not log:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Busqueda no encontrada"
+        )
+
+    return log
+
+
+def _preview(text: str) -> str:
+    """Recorta el texto a PREVIEW_LENGTH caracteres con '...' si es mas largo."""
+    return text[:PREVIEW_LENGTH] + "..." if len(text) > PREVIEW_LENGTH else text
+
+
+class _BatchItemError(Exception):
+    """Error de un termino del lote con su codigo para la linea NDJSON."""
+
+    def __init__(self, error: str, message: str):
+        super().__init__(message)
+        self.error = error
+
+
+def _batch_error(e: Exception) -> tuple:
+    """(codigo, mensaje) de la linea de error de un termino del lote."""
+    if isinstance(e, _BatchItemError):
+        return e.error, str(e)
+    if isinstance(e, ArticleNotFoundError):
+        return "ARTICLE_NOT_FOUND", str(e)
+    if isinstance(e, WebDriverPoolTimeout):
+        return "SCRAPER_BUSY", str(e)
+    return "WIKIPEDIA_SCRAPE_ERROR", f"Error al buscar en Wikipedia: {str(e)}"
+
+
+def _ndjson(payload: dict) -> str:
+    """Serializa un evento como una linea NDJSON."""
+    return json.dumps(payload, ensure_ascii=False) + "\n"
@@ -2,16 +2,19 @@ from fastapi import WebSocket
 from typing import List
 import json
 import asyncio
-import sys
+import logging
+import time
 import redis.asyncio as aioredis
 
 from app.config import settings
+from app.metrics import WEBSOCKET_BROADCAST_DURATION, WEBSOCKET_CONNECTIONS
+from app.tracing import extract_context, get_tracer, inject_context
 
 
-def log(msg):
-    """Log con flush inmediato."""
-    print(msg, flush=True)
-    sys.stdout.flush()
+logger = logging.getLogger(__name__)
+
+# Lineas por mensaje (alto volumen): se emite solo una fraccion LOG_SAMPLE_RATE
+SAMPLED = {"sampled": True}
 
 
 class ConnectionManager:
@@ -25,28 +28,37 @@ class ConnectionManager:
         """Acepta una nueva conexión WebSocket."""
         await websocket.accept()
         self.active_connections.append(websocket)
-        log(f"[WS] Conectado. Total: {len(self.active_connections)}")
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
+        logger.info("ws_connected", extra={"connections": len(self.active_connections)})
 
     def disconnect(self, websocket: WebSocket):
         """Desconecta un WebSocket."""
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
-        log(f"[WS] Desconectado. Total: {len(self.active_connections)}")
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
+        logger.info("ws_disconnected", extra={"connections": len(self.active_connections)})
 
     async def broadcast(self, message: dict):
-        """Broadcast a todas las conexiones."""
-        log(f"[WS] Broadcasting a {len(self.active_connections)} conexiones")
+        """
+        Broadcast a todas las conexiones.
+
+        Una sola linea de log por broadcast (muestreada), no una por conexion;
+        los envios fallidos se resumen en un warning. El mensaje se serializa
+        una vez (mismo formato que send_json) y se envia como texto.
+        """
         if not self.active_connections:
-            log("[WS] No hay conexiones activas")
+            logger.debug("ws_broadcast_skipped", extra={"event": message.get("type"), **SAMPLED})
             return
 
+        start = time.perf_counter()
+        payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
         dead_connections = []
+        last_error = None
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
-                log(f"[WS] Mensaje enviado: {message.get('type')}")
+                await connection.send_text(payload)
             except Exception as e:
-                log(f"[WS] Error enviando: {e}")
+                last_error = e
                 dead_connections.append(connection)
 
         # Limpiar conexiones muertas
@@ -54,6 +66,23 @@ class ConnectionManager:
             if conn in self.active_connections:
                 self.active_connections.remove(conn)
 
+        duration = time.perf_counter() - start
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
+        WEBSOCKET_BROADCAST_DURATION.observe(duration)
+
+        if dead_connections:
+            logger.warning("ws_broadcast_send_failed", extra={
+                "event": message.get("type"),
+                "failed": len(dead_connections),
+                "error": str(last_error)
+            })
+        logger.info("ws_broadcast", extra={
+            "event": message.get("type"),
+            "sent": len(self.active_connections),
+            "duration_ms": round(duration * 1000, 2),
+            **SAMPLED
+        })
+
 
 # Instancia global del manager
 manager = ConnectionManager()
@@ -65,34 +94,50 @@ REDIS_CHANNEL = "transaction_updates"
 def publish_transaction_update(transaction):
     """
     Publica actualización de transacción en Redis (llamado desde Celery).
-    Usa redis síncrono porque Celery es síncrono.
     """
-    import redis
-
     # Manejar status y tipo como string o Enum
     status_val = transaction.status.value if hasattr(transaction.status, 'value') else transaction.status
     tipo_val = transaction.tipo.value if hasattr(transaction.tipo, 'value') else transaction.tipo
 
-    message = {
-        "type": "STATUS_CHANGE",
-        "data": {
-            "id": str(transaction.id),
-            "user_id": transaction.user_id,
-            "status": status_val,
-            "monto": transaction.monto,
-            "tipo": tipo_val,
-            "updated_at": transaction.updated_at.isoformat() if transaction.updated_at else None,
-            "processed_at": transaction.processed_at.isoformat() if transaction.processed_at else None,
-            "error_message": transaction.error_message
-        }
-    }
+    publish_event("STATUS_CHANGE", {
+        "id": str(transaction.id),
+        "user_id": transaction.user_id,
+        "status": status_val,
+        "monto": transaction.monto,
+        "tipo": tipo_val,
+        "updated_at": transaction.updated_at.isoformat() if transaction.updated_at else None,
+        "processed_at": transaction.processed_at.isoformat() if transaction.processed_at else None,
+        "error_message": transaction.error_message
+    })
+
+
+def publish_event(event_type: str, data: dict):
+    """
+    Publica un evento en el canal de Redis para reenviarlo por WebSocket.
+    Usa redis síncrono porque Celery es síncrono.
+
+    Si hay una traza activa, su contexto viaja en "trace" para que el
+    broadcast quede en la misma traza.
+    """
+    import redis
+
+    message = {"type": event_type, "data": data}
+    trace_context = inject_context()
+    if trace_context:
+        message["trace"] = trace_context
 
     try:
         r = redis.from_url(settings.REDIS_URL)
         result = r.publish(REDIS_CHANNEL, json.dumps(message))
-        log(f"[REDIS] Publicado: {message['data']['id']} -> {status_val} (subs: {result})")
+        logger.info("redis_published", extra={
+            "event": event_type,
+            "id": data.get("id"),
+            "status": data.get("status"),
+            "subscribers": result,
+            **SAMPLED
+        })
     except Exception as e:
-        log(f"[REDIS] Error publicando: {e}")
+        logger.error("redis_publish_failed", extra={"event": event_type, "error": str(e)})
 
 
 async def redis_subscriber():
@@ -100,7 +145,7 @@ async def redis_subscriber():
     Suscriptor de Redis que escucha actualizaciones y las envía por WebSocket.
     Se ejecuta como background task en FastAPI.
     """
-    log(f"[REDIS-SUB] Iniciando suscriptor en canal: {REDIS_CHANNEL}")
+    logger.info("redis_subscriber_starting", extra={"channel": REDIS_CHANNEL})
 
     while True:
         try:
@@ -108,20 +153,27 @@ async def redis_subscriber():
             pubsub = r.pubsub()
             await pubsub.subscribe(REDIS_CHANNEL)
 
-            log("[REDIS-SUB] Suscrito, esperando mensajes...")
+            logger.info("redis_subscribed", extra={"channel": REDIS_CHANNEL})
 
             async for message in pubsub.listen():
-                log(f"[REDIS-SUB] Mensaje raw: type={message.get('type')}")
                 if message["type"] == "message":
                     try:
                         data = json.loads(message["data"])
-                        log(f"[REDIS-SUB] Recibido: {data.get('type')} - {data.get('data', {}).get('id', 'N/A')}")
-                        await manager.broadcast(data)
+                        logger.debug("redis_message_received", extra={
+                            "event": data.get("type"),
+                            "id": data.get("data", {}).get("id"),
+                            **SAMPLED
+                        })
+                        # El contexto de la traza no se reenvia a los clientes
+                        parent = extract_context(data.pop("trace", None))
+                        with get_tracer().start_as_current_span("websocket.broadcast", context=parent) as span:
+                            span.set_attribute("websocket.event", data.get("type") or "")
+                            span.set_attribute("websocket.connections", len(manager.active_connections))
+                            await manager.broadcast(data)
                     except json.JSONDecodeError as e:
-                        log(f"[REDIS-SUB] Error JSON: {e}")
-                    except Exception as e:
-                        log(f"[REDIS-SUB] Error procesando: {e}")
+                        logger.error("redis_message_invalid_json", extra={"error": str(e)})
+                    except Exception:
+                        logger.exception("redis_message_failed")
         except Exception as e:
-            log(f"[REDIS-SUB] Error conexión: {e}")
+            logger.error("redis_subscriber_connection_failed", extra={"error": str(e), "retry_in_s": 5})
             await asyncio.sleep(5)
-            log("[REDIS-SUB] Reintentando conexión...")
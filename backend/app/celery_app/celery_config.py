@@ -1,5 +1,11 @@
 from celery import Celery
 from app.config import settings
+from app.logging_config import instrument_celery_logging
+from app.metrics import instrument_celery
+from app.tracing import instrument_celery_tracing
+
+# Cola dedicada para tareas lentas de IA
+AI_QUEUE = "ai"
 
 celery_app = Celery(
     "legalario_tasks",
@@ -17,4 +23,19 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutos máximo
     result_expires=3600,  # Resultados expiran en 1 hora
+    # Tareas de IA (scraping + Claude) en su propia cola para no bloquear transacciones
+    task_routes={
+        "app.celery_app.tasks.summarize_batch_task": {"queue": AI_QUEUE},
+        "app.celery_app.tasks.summarize_job_task": {"queue": AI_QUEUE},
+        "app.celery_app.tasks.wikipedia_search_job_task": {"queue": AI_QUEUE},
+    },
 )
+
+# Logging estructurado (JSON con `extra`, muestreo) tambien en los workers
+instrument_celery_logging()
+
+# Duracion y reintentos de tareas + endpoint de metricas del worker
+instrument_celery()
+
+# Contexto de traza en los headers de las tareas y un span por ejecucion
+instrument_celery_tracing()
@@ -1,10 +1,20 @@
 import time
 import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+import redis
+from sqlalchemy import insert
+
 from app.celery_app.celery_config import celery_app
+from app.config import settings
 from app.database import SessionLocal
 from app.models.transaction import Transaction
+from app.models.assistant_log import AssistantLog
+from app.metrics import TRANSACTION_PROCESSING, TRANSACTION_QUEUE_WAIT
+from app.tracing import get_tracer
+from app.services.text_blobs import store_text, store_texts
 
 
 @celery_app.task(bind=True, max_retries=3)
@@ -15,7 +25,11 @@ def process_transaction_task(self, transaction_id: str):
     - Simula procesamiento con un banco externo (sleep 2-5 segundos).
     - Verifica duplicados y actualiza el status.
     - Notifica via WebSocket cuando cambia el status.
+    - Guarda started_at en la primera toma y registra spans del banco, el
+      commit y la publicacion dentro de la traza iniciada en la API.
     """
+    tracer = get_tracer()
+    start = time.perf_counter()
     db = SessionLocal()
 
     try:
@@ -39,9 +53,15 @@ def process_transaction_task(self, transaction_id: str):
                 "current_status": transaction.status
             }
 
-        # Simular procesamiento con banco externo (2-5 segundos)
-        processing_time = random.uniform(2, 5)
-        time.sleep(processing_time)
+        if transaction.started_at is None:
+            transaction.started_at = datetime.utcnow()
+            if transaction.enqueued_at:
+                TRANSACTION_QUEUE_WAIT.observe((transaction.started_at - transaction.enqueued_at).total_seconds())
+
+        # Simular procesamiento con banco externo (2-5 segundos por defecto)
+        processing_time = random.uniform(settings.BANK_LATENCY_MIN_SECONDS, settings.BANK_LATENCY_MAX_SECONDS)
+        with tracer.start_as_current_span("bank.process"):
+            time.sleep(processing_time)
 
         # Verificar si hay duplicados (mismos datos pero diferente ID)
         # Buscar transacciones con mismo user_id, monto, tipo que ya estén procesadas
@@ -68,16 +88,20 @@ def process_transaction_task(self, transaction_id: str):
                 transaction.error_message = "Error simulado en procesamiento del banco"
 
         transaction.updated_at = datetime.utcnow()
-        db.commit()
+        with tracer.start_as_current_span("db.commit"):
+            db.commit()
 
         # Notificar via Redis -> WebSocket
         try:
             from app.api.websocket import publish_transaction_update
-            publish_transaction_update(transaction)
+            with tracer.start_as_current_span("redis.publish"):
+                publish_transaction_update(transaction)
         except Exception as e:
             # Si falla la publicación, no es crítico
             print(f"Error publicando actualización: {e}")
 
+        TRANSACTION_PROCESSING.observe(time.perf_counter() - start)
+
         return {
             "status": "completed",
             "transaction_id": transaction_id,
@@ -91,3 +115,282 @@ def process_transaction_task(self, transaction_id: str):
         raise self.retry(exc=e, countdown=5)
     finally:
         db.close()
+
+
+@celery_app.task(bind=True)
+def summarize_batch_task(self, job_id: str, user_id: str, texts: list, max_tokens: int = 500):
+    """
+    Resume un lote de textos en background.
+
+    - Llama a Claude con concurrencia acotada (BATCH_SUMMARIZE_CONCURRENCY),
+      esperando el presupuesto del limitador de uso cuando se agota.
+    - Resumenes cacheados por texto; textos identicos comparten una sola llamada.
+    - Inserta los AssistantLog en bloques de BATCH_INSERT_SIZE.
+    - Actualiza el progreso del job en Redis.
+    - Notifica via WebSocket al terminar (BATCH_SUMMARY_COMPLETED, sin resultados).
+    """
+    from app.api.websocket import publish_event
+    from app.services import job_store, rate_limiter, singleflight, summary_cache
+    from app.services.claude_client import ClaudeClient
+
+    job_store.update_job(job_id, status="procesando", started_at=datetime.utcnow())
+
+    claude = ClaudeClient()
+    db = SessionLocal()
+    # Cada bloque confirmado renueva la marca de read-your-writes del usuario
+    db.info["user_id"] = user_id
+
+    def summarize(text: str) -> dict:
+        cached = summary_cache.get(text, max_tokens)
+        if cached is not None:
+            return cached
+
+        # En el worker se espera el presupuesto en lugar de rechazar
+        reservation = rate_limiter.acquire(
+            user_id,
+            rate_limiter.estimate_tokens(text, max_tokens),
+            max_wait=-1
+        )
+        try:
+            result = claude.summarize(text=text, max_tokens=max_tokens)
+        except Exception:
+            rate_limiter.reconcile(reservation, 0)
+            raise
+        rate_limiter.reconcile(reservation, rate_limiter.result_tokens(result))
+        summary_cache.put(text, max_tokens, result)
+        return result
+
+    def summarize_item(text: str) -> dict:
+        # Cacheado y coalescido como /wikipedia/search: textos repetidos en el
+        # lote (o en otros workers) comparten una sola llamada. Copia porque el
+        # resultado compartido no debe llevar el tiempo de este item
+        start_time = time.time()
+        result = dict(singleflight.run(summary_cache.cache_key(text, max_tokens), lambda: summarize(text)))
+        result["processing_time_ms"] = int((time.time() - start_time) * 1000)
+        return result
+
+    pending_rows = []
+    pending_results = []
+
+    def flush():
+        # Insertar los textos (deduplicados) y las filas del bloque en un executemany cada uno
+        if pending_rows:
+            hashes = store_texts(db, [row.pop("original_text") for row in pending_rows])
+            for row, digest in zip(pending_rows, hashes):
+                row["original_text_hash"] = digest
+            db.execute(insert(AssistantLog), pending_rows)
+            db.commit()
+        job_store.record_results(job_id, pending_results)
+        pending_rows.clear()
+        pending_results.clear()
+
+    try:
+        with ThreadPoolExecutor(max_workers=settings.BATCH_SUMMARIZE_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(summarize_item, text): index
+                for index, text in enumerate(texts)
+            }
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    pending_results.append({"index": index, "error": str(e)})
+                else:
+                    log_id = uuid.uuid4()
+                    pending_rows.append({
+                        "id": log_id,
+                        "user_id": uuid.UUID(user_id),
+                        "original_text": texts[index],
+                        "summary": result["summary"],
+                        "model_used": result["model"],
+                        "tokens_input": result.get("tokens_input"),
+                        "tokens_output": result.get("tokens_output"),
+                        "processing_time_ms": result["processing_time_ms"],
+                        "created_at": datetime.utcnow()
+                    })
+                    pending_results.append({"index": index, "id": str(log_id)})
+
+                if len(pending_results) >= settings.BATCH_INSERT_SIZE:
+                    flush()
+
+        flush()
+        job_store.update_job(job_id, status="completado", finished_at=datetime.utcnow())
+    except Exception as e:
+        db.rollback()
+        job_store.update_job(job_id, status="fallido", error=str(e), finished_at=datetime.utcnow())
+        raise
+    finally:
+        db.close()
+        # Dentro del finally un error de Redis ocultaria la excepcion original,
+        # y el job puede haber expirado
+        try:
+            job = job_store.get_job(job_id)
+        except redis.RedisError as e:
+            print(f"[BATCH] No se pudo leer el job {job_id}: {e}")
+            job = None
+        if job:
+            # Solo id, kind y status: el progreso y los resultados se piden a GET /jobs/{id}
+            publish_event("BATCH_SUMMARY_COMPLETED", {
+                "id": job_id,
+                "kind": "summarize_batch",
+                "status": job["status"]
+            })
+
+    counts = {key: job[key] for key in ("total", "completed", "failed")} if job else {}
+    return {"status": "completed", "job_id": job_id, **counts}
+
+
+@celery_app.task(bind=True)
+def summarize_job_task(self, job_id: str, user_id: str, text: str, max_tokens: int = 500, mode: str = "auto"):
+    """
+    Genera un resumen en background (modo async de /assistant/summarize).
+
+    - Espera el presupuesto del limitador de uso, llama a Claude y guarda el AssistantLog.
+    - Notifica via WebSocket con el evento AI_JOB_COMPLETED.
+    """
+    from app.services import rate_limiter
+    from app.services.claude_client import ClaudeClient
+
+    def run(db) -> dict:
+        reservation = rate_limiter.acquire(
+            user_id,
+            rate_limiter.estimate_tokens(text, max_tokens),
+            max_wait=-1
+        )
+        start_time = time.time()
+        try:
+            result = ClaudeClient().summarize_with_mode(text=text, max_tokens=max_tokens, mode=mode)
+        except Exception as e:
+            rate_limiter.reconcile(reservation, 0)
+            raise Exception(f"Error al comunicarse con Claude API: {str(e)}")
+        rate_limiter.reconcile(reservation, rate_limiter.result_tokens(result))
+
+        log_entry = AssistantLog(
+            user_id=uuid.UUID(user_id),
+            original_text_hash=store_text(db, text),
+            summary=result["summary"],
+            model_used=result["model"],
+            tokens_input=result.get("tokens_input"),
+            tokens_output=result.get("tokens_output"),
+            processing_time_ms=int((time.time() - start_time) * 1000),
+            stages=result.get("stages")
+        )
+        db.add(log_entry)
+        db.commit()
+        db.refresh(log_entry)
+
+        return {
+            "id": str(log_entry.id),
+            "summary": log_entry.summary,
+            "model_used": log_entry.model_used,
+            "tokens_input": log_entry.tokens_input,
+            "tokens_output": log_entry.tokens_output,
+            "processing_time_ms": log_entry.processing_time_ms
+        }
+
+    return _run_ai_job(job_id, user_id, "summarize", run)
+
+
+@celery_app.task(bind=True)
+def wikipedia_search_job_task(self, job_id: str, user_id: str, search_term: str, max_tokens: int = 500):
+    """
+    Busca en Wikipedia y resume en background (modo async de /wikipedia/search).
+
+    - Extraccion (cacheada), resumen con Claude (cacheado) y guardado del WikipediaLog.
+    - Notifica via WebSocket con el evento AI_JOB_COMPLETED.
+    """
+    from app.models.wikipedia_log import WikipediaLog
+    from app.services import rate_limiter, singleflight, summary_cache, wikipedia_cache
+    from app.services.claude_client import ClaudeClient
+    from app.services.wikipedia_scraper import WikipediaScraper
+
+    def run(db) -> dict:
+        start_time = time.time()
+
+        try:
+            wiki_result = singleflight.run(
+                wikipedia_cache.cache_key(search_term),
+                lambda: wikipedia_cache.get_article(search_term, WikipediaScraper().search_and_extract)
+            )
+        except Exception as e:
+            raise Exception(f"Error al buscar en Wikipedia: {str(e)}")
+
+        def summarize() -> dict:
+            cached = summary_cache.get(wiki_result["text"], max_tokens)
+            if cached is not None:
+                return cached
+
+            reservation = rate_limiter.acquire(
+                user_id,
+                rate_limiter.estimate_tokens(wiki_result["text"], max_tokens),
+                max_wait=-1
+            )
+            try:
+                result = ClaudeClient().summarize(text=wiki_result["text"], max_tokens=max_tokens)
+            except Exception as e:
+                rate_limiter.reconcile(reservation, 0)
+                raise Exception(f"Error al generar resumen con Claude: {str(e)}")
+            rate_limiter.reconcile(reservation, rate_limiter.result_tokens(result))
+            summary_cache.put(wiki_result["text"], max_tokens, result)
+            return result
+
+        summary_result = singleflight.run(summary_cache.cache_key(wiki_result["text"], max_tokens), summarize)
+
+        log_entry = WikipediaLog(
+            user_id=uuid.UUID(user_id),
+            search_term=search_term,
+            wikipedia_url=wiki_result["url"],
+            extracted_text_hash=store_text(db, wiki_result["text"]),
+            summary=summary_result["summary"],
+            model_used=summary_result["model"],
+            processing_time_ms=int((time.time() - start_time) * 1000)
+        )
+        db.add(log_entry)
+        db.commit()
+        db.refresh(log_entry)
+
+        return {
+            "id": str(log_entry.id),
+            "search_term": log_entry.search_term,
+            "wikipedia_url": log_entry.wikipedia_url,
+            "summary": log_entry.summary,
+            "model_used": log_entry.model_used,
+            "processing_time_ms": log_entry.processing_time_ms
+        }
+
+    return _run_ai_job(job_id, user_id, "wikipedia_search", run)
+
+
+def _run_ai_job(job_id: str, user_id: str, kind: str, run) -> dict:
+    """
+    Ejecuta un job de IA de un solo elemento: actualiza su estado en Redis,
+    guarda el resultado y publica AI_JOB_COMPLETED (id, kind y status) por WebSocket.
+    """
+    from app.api.websocket import publish_event
+    from app.services import job_store
+
+    job_store.update_job(job_id, status="procesando", started_at=datetime.utcnow())
+    db = SessionLocal()
+    # El commit del resultado marca al usuario para read-your-writes
+    db.info["user_id"] = user_id
+
+    try:
+        result = {"index": 0, **run(db)}
+        job_store.record_results(job_id, [result])
+        job_store.update_job(job_id, status="completado", finished_at=datetime.utcnow())
+        status = "completado"
+    except Exception as e:
+        db.rollback()
+        job_store.record_results(job_id, [{"index": 0, "error": str(e)}])
+        job_store.update_job(job_id, status="fallido", error=str(e), finished_at=datetime.utcnow())
+        status = "fallido"
+    finally:
+        db.close()
+
+    # El canal llega a todos los sockets (sin autenticar): solo se anuncia el
+    # job; el dueno pide el resultado a GET /jobs/{id}, que verifica el usuario
+    event = {"id": job_id, "kind": kind, "status": status}
+    publish_event("AI_JOB_COMPLETED", event)
+    return event
@@ -1,12 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
+from app.metrics import InstrumentedQueuePool, register_db_pool
+from app.replicas import ReplicaSet
+from app.slow_queries import install_slow_query_log
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, poolclass=InstrumentedQueuePool)
+register_db_pool(engine.pool)
+install_slow_query_log(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Replicas de lectura opcionales (DATABASE_REPLICA_URLS vacio = todo al primario)
+replicas = ReplicaSet(settings.DATABASE_REPLICA_URLS)
+
 
 def get_db():
     """Dependency para obtener sesión de base de datos."""
@@ -15,3 +23,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def is_replica_session(db: Session) -> bool:
+    """True si la sesion lee de una replica (ver get_read_db)."""
+    return db.get_bind() is not engine
+
+
+# Read-your-writes: las sesiones que escriben en nombre de un usuario llevan su
+# id en session.info["user_id"] (get_current_user, y las sesiones propias de
+# los endpoints streaming y de los workers de IA); al confirmar escrituras se
+# marca al usuario para que sus lecturas siguientes vayan al primario
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state):
+    # db.execute(insert(...)) en bloque no pasa por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_recent_write(session):
+    if session.info.pop("wrote", False) and replicas and session.info.get("user_id"):
+        from app.services import recent_writes
+
+        recent_writes.mark_write(session.info["user_id"])
@@ -0,0 +1,112 @@
+"""
+Manifiesto en memoria del frontend compilado (frontend_dist / frontend/dist).
+
+Al iniciar se leen todos los archivos una vez y se precalculan sus
+variantes gzip/brotli y ETags fuertes, asi servir un archivo no toca el
+disco ni comprime por request.
+
+- /assets/* (nombres con hash de Vite): Cache-Control immutable por un ano
+- Resto (index.html, favicon, ...): no-cache, se revalida con ETag (304)
+- Rutas desconocidas: index.html desde memoria (SPA routing)
+"""
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import PlainTextResponse
+
+from app.api.compression import SUPPORTED_ENCODINGS, choose_encoding, compress, is_compressible
+from app.api.http_cache import etag_matches
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Archivos mas chicos no ganan nada comprimidos
+MIN_COMPRESS_BYTES = 512
+
+
+@dataclass
+class Asset:
+    media_type: str
+    cache_control: str
+    etag: str
+    body: bytes
+    # Variantes precomprimidas por codificacion ("br", "gzip")
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+def _build_asset(path: Path, relative: str) -> Asset:
+    body = path.read_bytes()
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type in ("application/javascript", "application/json"):
+        media_type += "; charset=utf-8"
+
+    encoded = {}
+    if is_compressible(media_type) and len(body) >= MIN_COMPRESS_BYTES:
+        for encoding in SUPPORTED_ENCODINGS:
+            # Se hace una sola vez al iniciar: maxima compresion
+            variant = compress(body, encoding, level=11 if encoding == "br" else 9)
+            if len(variant) < len(body):
+                encoded[encoding] = variant
+
+    return Asset(
+        media_type=media_type,
+        cache_control=IMMUTABLE_CACHE_CONTROL if relative.startswith("assets/") else REVALIDATE_CACHE_CONTROL,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        body=body,
+        encoded=encoded
+    )
+
+
+def build_manifest(directory: Optional[Path]) -> Dict[str, Asset]:
+    """Lee todos los archivos del build y retorna {ruta relativa: Asset}."""
+    if not directory or not directory.exists():
+        return {}
+
+    manifest = {}
+    for path in directory.rglob("*"):
+        if path.is_file():
+            relative = path.relative_to(directory).as_posix()
+            manifest[relative] = _build_asset(path, relative)
+    return manifest
+
+
+def serve(manifest: Dict[str, Asset], path: str, request: Request) -> Optional[Response]:
+    """
+    Respuesta para `path` desde el manifiesto, con index.html como fallback
+    para las rutas del SPA. Un archivo inexistente bajo assets/ (p. ej. un
+    bundle con hash de un deploy anterior) es 404, como con StaticFiles.
+    None si el build no tiene index.html.
+    """
+    asset = manifest.get(path)
+    if asset is None:
+        if path.startswith("assets/"):
+            return PlainTextResponse("Not Found", status_code=404)
+        asset = manifest.get("index.html")
+    if asset is None:
+        return None
+
+    encoding = choose_encoding(request.headers.get("accept-encoding"), available=tuple(asset.encoded))
+    # ETag fuerte distinto por representacion
+    etag = f'{asset.etag[:-1]}-{encoding}"' if encoding else asset.etag
+
+    headers = {
+        "Content-Type": asset.media_type,
+        "ETag": etag,
+        "Cache-Control": asset.cache_control,
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Type")
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return Response(content=asset.encoded[encoding], headers=headers)
+
+    return Response(content=asset.body, headers=headers)
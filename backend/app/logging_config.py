@@ -0,0 +1,130 @@
+"""
+Logging estructurado y no bloqueante.
+
+- Los loggers escriben en un QueueHandler: el hilo que loguea (p. ej. el
+  event loop durante un broadcast) solo encola el record, sin formatearlo
+  (ni el mensaje ni el traceback); un QueueListener en otro hilo lo
+  formatea y lo escribe
+- En los workers de Celery se configura igual via sus senales (ver
+  instrument_celery_logging)
+- Formato JSON (una linea por record, con los campos de `extra`) o texto
+- Las lineas por mensaje se marcan con extra={"sampled": True} y solo se
+  emite una fraccion LOG_SAMPLE_RATE de ellas
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+from app.config import settings
+
+
+# Atributos propios de LogRecord: lo demas viene de `extra` y va al JSON
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sampled"}
+
+_listener = None
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Deja pasar una fraccion `rate` de los records marcados como sampled."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class _EnqueueOnlyHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que encola el record tal cual. El prepare() de la stdlib lo
+    formatea (traceback incluido) en el hilo que loguea; la cola es del mismo
+    proceso, asi que no hace falta dejarlo serializable.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(stream=None):
+    """
+    Configura el logger raiz del proceso con QueueHandler -> QueueListener.
+    Idempotente: una segunda llamada reemplaza la configuracion anterior.
+    """
+    global _listener
+
+    _stop_listener()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+    # Cola sin limite: loguear nunca bloquea al que loguea
+    log_queue = queue.SimpleQueue()
+    queue_handler = _EnqueueOnlyHandler(log_queue)
+    # El muestreo se decide antes de encolar, asi lo descartado no cuesta formateo
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # httpx loguea cada request en INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def instrument_celery_logging():
+    """
+    Usa esta configuracion en los workers de Celery en lugar de la suya (que
+    descarta los campos de `extra` y no muestrea). Con prefork el hilo del
+    QueueListener no sobrevive al fork: cada proceso hijo lo vuelve a crear.
+    """
+    from celery import signals
+
+    @signals.setup_logging.connect(weak=False)
+    def _setup_logging(**kwargs):
+        setup_logging()
+
+    @signals.worker_process_init.connect(weak=False)
+    def _worker_process_init(**kwargs):
+        setup_logging()
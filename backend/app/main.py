@@ -2,28 +2,50 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 import asyncio
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import transactions_router, auth_router, assistant_router, wikipedia_router
 from app.api.websocket import manager, redis_subscriber
-from app.seed import create_default_user
+from app.api.compression import CompressionMiddleware
+from app.api.metrics import MetricsMiddleware, metrics_response
+from app.api.profiling import ProfilingMiddleware
+from app.metrics import register_celery_queues
+from app.tracing import setup_tracing
+from app.logging_config import setup_logging
+from app.frontend_assets import build_manifest, serve as serve_asset
+from app.config import settings
+from app.services.wikipedia_scraper import get_driver_pool
+
+
+def _warm_driver_pool():
+    try:
+        get_driver_pool().warm()
+        print("Pool de WebDrivers precalentado")
+    except Exception as e:
+        print(f"No se pudo precalentar el pool de WebDrivers: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Lifecycle manager - ejecuta seed y suscriptor Redis al iniciar."""
-    # Startup: crear usuario por defecto
-    create_default_user()
+    """
+    Lifecycle manager - inicia el suscriptor Redis.
 
+    El usuario por defecto ya no se crea aca: es un paso unico de despliegue
+    (`python -m app.seed`, despues de `alembic upgrade head`).
+    """
     # Iniciar suscriptor de Redis en background
     subscriber_task = asyncio.create_task(redis_subscriber())
     print("Suscriptor Redis iniciado como background task")
 
+    # Arrancar los navegadores del scraping sin bloquear el inicio de la API
+    if settings.WEBDRIVER_POOL_PREWARM:
+        asyncio.get_running_loop().run_in_executor(None, _warm_driver_pool)
+
     yield
 
+    get_driver_pool().close()
+
     # Shutdown: cancelar el suscriptor
     subscriber_task.cancel()
     try:
@@ -32,6 +54,9 @@ async def lifespan(app: FastAPI):
         print("Suscriptor Redis detenido")
 
 
+setup_logging()
+setup_tracing("legalario-api")
+
 app = FastAPI(
     title="Legalario Transactions API",
     description="API para gestión de transacciones con procesamiento síncrono y asíncrono",
@@ -46,8 +71,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Compresion br/gzip de respuestas (despues de CORS para que tambien cubra sus headers)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
+# Latencia por ruta e in-flight (la mas externa, mide tambien la compresion)
+app.add_middleware(MetricsMiddleware)
+
+# Perfilado bajo demanda y ruta en curso para el log de queries lentas (envuelve a todos)
+app.add_middleware(ProfilingMiddleware)
+
+# Profundidad de las colas de Celery, leida del broker en cada scrape
+register_celery_queues()
+
 # Incluir routers
 app.include_router(auth_router, prefix="/api")
 app.include_router(transactions_router, prefix="/api")
@@ -59,7 +97,17 @@ app.include_router(wikipedia_router, prefix="/api")
 @app.get("/api/health")
 def health_check():
     """Endpoint de salud para verificar que la API está funcionando."""
-    return {"status": "healthy", "service": "legalario-transactions"}
+    return {
+        "status": "healthy",
+        "service": "legalario-transactions",
+        "webdriver_pool": get_driver_pool().stats()
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Metricas Prometheus del proceso de la API."""
+    return metrics_response()
 
 
 # WebSocket endpoint para streaming de transacciones
@@ -96,30 +144,25 @@ for path in FRONTEND_PATHS:
         FRONTEND_DIR = path
         break
 
-if FRONTEND_DIR and (FRONTEND_DIR / "assets").exists():
-    # Montar archivos estáticos (JS, CSS, imágenes)
-    app.mount("/assets", StaticFiles(directory=FRONTEND_DIR / "assets"), name="assets")
+# Archivos del build en memoria, con variantes gzip/brotli precalculadas
+FRONTEND_MANIFEST = build_manifest(FRONTEND_DIR)
 
 
 # Catch-all para SPA routing - debe ir al final
 @app.get("/{path:path}")
-async def serve_frontend(path: str):
+async def serve_frontend(path: str, request: Request):
     """
-    Sirve el frontend React.
-    Para rutas que no son API, retorna index.html (SPA routing).
+    Sirve el frontend React desde el manifiesto en memoria.
+
+    - Archivos del build con gzip/brotli segun Accept-Encoding, ETag y 304
+    - /assets/* con Cache-Control immutable (nombres con hash)
+    - Para rutas que no son archivos retorna index.html (SPA routing)
     """
-    if not FRONTEND_DIR or not FRONTEND_DIR.exists():
+    if not FRONTEND_MANIFEST:
         return {"message": "Frontend not built. Run 'docker-compose --profile build up frontend' or 'npm run build' in frontend directory."}
 
-    file_path = FRONTEND_DIR / path
-
-    # Si el archivo existe, servirlo
-    if file_path.exists() and file_path.is_file():
-        return FileResponse(file_path)
-
-    # Si no, servir index.html para que React Router maneje la ruta
-    index_path = FRONTEND_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
+    response = serve_asset(FRONTEND_MANIFEST, path, request)
+    if response is None:
+        return {"message": "Frontend not found"}
 
-    return {"message": "Frontend not found"}
+    return response
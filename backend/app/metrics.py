@@ -0,0 +1,192 @@
+"""
+Metricas Prometheus del proceso (API o worker de Celery).
+
+- API: latencia por ruta e in-flight (MetricsMiddleware), espera del
+  checkout del pool de SQLAlchemy, profundidad de las colas de Celery
+  (leida del broker en cada scrape) y WebSockets activos / duracion del
+  broadcast
+- Workers: duracion y reintentos de las tareas (senales de Celery), con
+  su propio endpoint HTTP en CELERY_METRICS_PORT
+- Ambos: latencia de los upstreams (Claude, Wikipedia HTTP, Selenium)
+
+Cada proceso tiene su propio registro; Prometheus los scrapea por separado.
+"""
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import redis
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+
+
+# Buckets para llamadas lentas (modelo, navegador, tareas de Celery)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de las requests HTTP por ruta",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests HTTP en curso",
+    ["method"]
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Espera para obtener una conexion del pool de SQLAlchemy",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+)
+
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Tiempo de ejecucion de las tareas de Celery",
+    ["task", "state"],
+    buckets=SLOW_BUCKETS
+)
+CELERY_TASK_RETRIES = Counter(
+    "celery_task_retries_total",
+    "Reintentos de tareas de Celery",
+    ["task"]
+)
+
+TRANSACTION_QUEUE_WAIT = Histogram(
+    "transaction_queue_wait_seconds",
+    "Espera de una transaccion async entre el encolado y la toma por un worker",
+    buckets=SLOW_BUCKETS
+)
+TRANSACTION_PROCESSING = Histogram(
+    "transaction_processing_seconds",
+    "Procesamiento de una transaccion async en el worker (banco, commit y publicacion)",
+    buckets=SLOW_BUCKETS
+)
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections_active",
+    "Conexiones WebSocket abiertas"
+)
+WEBSOCKET_BROADCAST_DURATION = Histogram(
+    "websocket_broadcast_duration_seconds",
+    "Duracion del envio de un mensaje a todas las conexiones WebSocket",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "Latencia de las llamadas a servicios externos",
+    ["upstream", "outcome"],
+    buckets=SLOW_BUCKETS
+)
+
+
+@contextmanager
+def observe_upstream(upstream: str):
+    """Mide una llamada a `upstream` ("claude", "wikipedia_http", "selenium")."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        UPSTREAM_DURATION.labels(upstream, outcome).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que registra cuanto espera cada checkout por una conexion."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+class _DbPoolCollector:
+    """Estado de los pools de conexiones (primario y replicas) leido en cada scrape."""
+
+    def __init__(self):
+        self.pools = {}
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        gauge = GaugeMetricFamily("db_pool_connections", "Conexiones del pool de SQLAlchemy", labels=["pool", "state"])
+        for name, pool in self.pools.items():
+            gauge.add_metric([name, "checked_out"], pool.checkedout())
+            gauge.add_metric([name, "idle"], pool.checkedin())
+            gauge.add_metric([name, "overflow"], max(pool.overflow(), 0))
+            gauge.add_metric([name, "size"], pool.size())
+        yield gauge
+
+
+_db_pools = _DbPoolCollector()
+
+
+@lru_cache
+def _get_broker() -> redis.Redis:
+    return redis.from_url(settings.CELERY_BROKER_URL, socket_timeout=1)
+
+
+class _CeleryQueueCollector:
+    """Mensajes pendientes por cola de Celery (LLEN en el broker Redis)."""
+
+    def describe(self):
+        # Sin describe() el registro llamaria a collect() (y al broker) al registrarse
+        return []
+
+    def collect(self):
+        gauge = GaugeMetricFamily("celery_queue_depth", "Mensajes pendientes por cola de Celery", labels=["queue"])
+        try:
+            pipe = _get_broker().pipeline(transaction=False)
+            for queue in settings.METRICS_CELERY_QUEUES:
+                pipe.llen(queue)
+            for queue, depth in zip(settings.METRICS_CELERY_QUEUES, pipe.execute()):
+                gauge.add_metric([queue], depth)
+        except redis.RedisError as e:
+            print(f"[METRICS] No se pudo leer la profundidad de las colas: {e}")
+        yield gauge
+
+
+def register_db_pool(pool: QueuePool, name: str = "primary"):
+    if not _db_pools.pools:
+        REGISTRY.register(_db_pools)
+    _db_pools.pools[name] = pool
+
+
+def register_celery_queues():
+    REGISTRY.register(_CeleryQueueCollector())
+
+
+def instrument_celery():
+    """Conecta las senales de Celery que alimentan las metricas de tareas (en el worker)."""
+    from celery import signals
+
+    started = {}
+
+    @signals.task_prerun.connect(weak=False)
+    def _task_prerun(task_id=None, **kwargs):
+        started[task_id] = time.perf_counter()
+
+    @signals.task_postrun.connect(weak=False)
+    def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+        start = started.pop(task_id, None)
+        if start is not None:
+            CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - start)
+
+    @signals.task_retry.connect(weak=False)
+    def _task_retry(sender=None, **kwargs):
+        CELERY_TASK_RETRIES.labels(sender.name).inc()
+
+    @signals.worker_init.connect(weak=False)
+    def _start_metrics_server(**kwargs):
+        if settings.CELERY_METRICS_PORT:
+            from prometheus_client import start_http_server
+            start_http_server(settings.CELERY_METRICS_PORT)
+            print(f"[METRICS] Metricas del worker en el puerto {settings.CELERY_METRICS_PORT}")
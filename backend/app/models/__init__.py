@@ -2,5 +2,6 @@ from app.models.transaction import Transaction, TransactionStatus, TransactionTy
 from app.models.user import User
 from app.models.assistant_log import AssistantLog
 from app.models.wikipedia_log import WikipediaLog
+from app.models.text_blob import TextBlob
 
-__all__ = ["Transaction", "TransactionStatus", "TransactionType", "User", "AssistantLog", "WikipediaLog"]
+__all__ = ["Transaction", "TransactionStatus", "TransactionType", "User", "AssistantLog", "WikipediaLog", "TextBlob"]
@@ -1,9 +1,11 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Index, Column, String, DateTime, Integer, Text, ForeignKey
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 
 from app.database import Base
+from app.models.text_blob import TextBlob
 
 
 class AssistantLog(Base):
@@ -11,13 +13,32 @@ class AssistantLog(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    original_text = Column(Text, nullable=False)
+    # Texto original deduplicado en text_blobs (ver app.services.text_blobs)
+    original_text_hash = Column(String(64), ForeignKey("text_blobs.hash"), nullable=False, index=True)
     summary = Column(Text, nullable=False)
     model_used = Column(String(100), nullable=False, default="claude-sonnet-4-20250514")
     tokens_input = Column(Integer, nullable=True)
     tokens_output = Column(Integer, nullable=True)
     processing_time_ms = Column(Integer, nullable=True)
+    # Tiempos y tokens por etapa (solo en resumenes map-reduce)
+    stages = Column(JSONB, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
 
+    # Busqueda full-text (diferida), mantenida por el trigger assistant_logs_search_vector_update:
+    # resumen con mas peso que el texto original
+    search_vector = deferred(Column(TSVECTOR))
+
+    original_text_blob = relationship(TextBlob)
+
+    # Historial por usuario (keyset: created_at DESC, id DESC)
+    __table_args__ = (
+        Index("ix_assistant_logs_user_id_created_at_id", user_id, created_at.desc(), id.desc()),
+        Index("ix_assistant_logs_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    @property
+    def original_text(self) -> str:
+        return self.original_text_blob.content
+
     def __repr__(self):
         return f"<AssistantLog {self.id}>"
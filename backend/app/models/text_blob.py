@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, DateTime
+
+from app.database import Base
+
+
+class TextBlob(Base):
+    """
+    Texto grande deduplicado por contenido (SHA-256 del texto en UTF-8).
+    PostgreSQL lo comprime en TOAST (lz4 si esta disponible, si no pglz).
+    """
+    __tablename__ = "text_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    content = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<TextBlob {self.hash[:12]} ({self.size_bytes} bytes)>"
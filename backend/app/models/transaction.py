@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy import Index, Column, String, Float, DateTime
 from sqlalchemy.dialects.postgresql import UUID, ENUM as PG_ENUM
 
 from app.database import Base
@@ -51,10 +51,19 @@ class Transaction(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     processed_at = Column(DateTime, nullable=True)
+    # Encolado en Celery y primera toma por un worker (espera en cola = started_at - enqueued_at)
+    enqueued_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
 
     # Tracking de Celery
     celery_task_id = Column(String(255), nullable=True)
     error_message = Column(String(500), nullable=True)
 
+    # max(updated_at) para los ETags del listado
+    __table_args__ = (
+        Index("ix_transactions_updated_at", updated_at),
+        Index("ix_transactions_user_id_updated_at", user_id, updated_at),
+    )
+
     def __repr__(self):
         return f"<Transaction {self.id} - {self.user_id} - {self.monto} - {self.status}>"
@@ -1,9 +1,11 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Index, Computed, Column, String, Text, Integer, DateTime, ForeignKey
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 
 from app.database import Base
+from app.models.text_blob import TextBlob
 
 
 class WikipediaLog(Base):
@@ -14,8 +16,28 @@ class WikipediaLog(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     search_term = Column(String(500), nullable=False)
     wikipedia_url = Column(String(1000), nullable=True)
-    extracted_text = Column(Text, nullable=False)
+    # Texto extraido deduplicado en text_blobs (ver app.services.text_blobs)
+    extracted_text_hash = Column(String(64), ForeignKey("text_blobs.hash"), nullable=False, index=True)
     summary = Column(Text, nullable=False)
     model_used = Column(String(100), nullable=True)
     processing_time_ms = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    # Busqueda full-text generada por PostgreSQL (diferida): termino con mas peso que el resumen
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('spanish', coalesce(search_term, '')), 'A') || "
+        "setweight(to_tsvector('spanish', coalesce(summary, '')), 'B')",
+        persisted=True
+    )))
+
+    # Historial por usuario (keyset: created_at DESC, id DESC)
+    __table_args__ = (
+        Index("ix_wikipedia_logs_user_id_created_at_id", user_id, created_at.desc(), id.desc()),
+        Index("ix_wikipedia_logs_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    extracted_text_blob = relationship(TextBlob)
+
+    @property
+    def extracted_text(self) -> str:
+        return self.extracted_text_blob.content
@@ -0,0 +1,102 @@
+"""
+Replicas de lectura de Postgres con round-robin y chequeo de salud.
+
+- Un engine por URL de DATABASE_REPLICA_URLS (pool propio, metricas con pool=replica-N)
+- pick() rota entre las replicas sanas; si no hay ninguna retorna None y la
+  lectura va al primario
+- La salud se revisa como maximo cada REPLICA_HEALTH_CHECK_INTERVAL_SECONDS, en
+  el hilo que pide la replica: conectar, y que el retraso de replicacion no
+  supere REPLICA_MAX_LAG_SECONDS. Una replica que falla una consulta se marca
+  caida de inmediato (mark_failed)
+"""
+import itertools
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.metrics import InstrumentedQueuePool, register_db_pool
+from app.slow_queries import install_slow_query_log
+
+
+# 0 si la replica esta al dia (o si la URL apunta a un primario); si no, segundos
+# desde la ultima transaccion aplicada
+REPLICATION_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class _Replica:
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReplicaSet:
+    def __init__(self, urls: List[str]):
+        self.replicas = []
+        for index, url in enumerate(urls):
+            engine = create_engine(
+                url,
+                poolclass=InstrumentedQueuePool,
+                pool_pre_ping=True,
+                connect_args={"connect_timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS}
+            )
+            name = f"replica-{index}"
+            register_db_pool(engine.pool, name=name)
+            install_slow_query_log(engine)
+            self.replicas.append(_Replica(name, engine))
+
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _check(self, replica: _Replica):
+        try:
+            with replica.engine.connect() as conn:
+                lag = conn.execute(REPLICATION_LAG_SQL).scalar() or 0
+            healthy = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                print(f"[REPLICAS] {replica.name} con {lag:.1f}s de retraso, se excluye")
+        except Exception as e:
+            healthy = False
+            print(f"[REPLICAS] {replica.name} no responde: {e}")
+        replica.healthy = healthy
+
+    def _is_healthy(self, replica: _Replica) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # Solo el primer hilo que encuentra el chequeo vencido lo ejecuta
+            due = now - replica.checked_at >= settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS
+            if due:
+                replica.checked_at = now
+        if due:
+            self._check(replica)
+        return replica.healthy
+
+    def pick(self) -> Optional[Engine]:
+        """Engine de la siguiente replica sana en round-robin, o None."""
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._is_healthy(replica):
+                return replica.engine
+        return None
+
+    def mark_failed(self, engine: Engine):
+        """Excluye la replica hasta el proximo chequeo (tras un error de conexion en una lectura)."""
+        for replica in self.replicas:
+            if replica.engine is engine:
+                replica.healthy = False
+                replica.checked_at = time.monotonic()
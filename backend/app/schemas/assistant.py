@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Literal, List, Annotated
 from datetime import datetime
 from uuid import UUID
 
@@ -18,6 +18,10 @@ class SummarizeRequest(BaseModel):
         le=2000,
         description="Maximo de tokens para el resumen"
     )
+    mode: Literal["auto", "single", "map_reduce"] = Field(
+        default="auto",
+        description="single: una sola llamada; map_reduce: por bloques en paralelo; auto: map_reduce para textos largos"
+    )
 
 
 class SummarizeResponse(BaseModel):
@@ -29,6 +33,7 @@ class SummarizeResponse(BaseModel):
     tokens_input: Optional[int] = None
     tokens_output: Optional[int] = None
     processing_time_ms: Optional[int] = None
+    stages: Optional[dict] = None
     created_at: datetime
 
     class Config:
@@ -58,3 +63,29 @@ class AssistantLogDetailResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AssistantSearchResult(BaseModel):
+    """Schema de un resultado de busqueda full-text en el historial de resumenes."""
+    id: UUID
+    summary_highlight: str
+    original_text_highlight: str
+    rank: float
+    model_used: str
+    created_at: datetime
+
+
+class BatchSummarizeRequest(BaseModel):
+    """Schema para solicitar resumenes de un lote de textos."""
+    texts: List[Annotated[str, Field(min_length=10, max_length=50000)]] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Textos a resumir (maximo 500 por lote)"
+    )
+    max_tokens: Optional[int] = Field(
+        default=500,
+        ge=50,
+        le=2000,
+        description="Maximo de tokens para cada resumen"
+    )
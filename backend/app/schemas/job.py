@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class JobAcceptedResponse(BaseModel):
+    """Schema de respuesta al encolar un job en background."""
+    job_id: str
+    status: str
+    total: int
+    message: str
+
+
+class JobStatusResponse(BaseModel):
+    """Schema con el progreso y resultados de un job en background."""
+    job_id: str
+    kind: str
+    status: str
+    total: int
+    completed: int
+    failed: int
+    results: List[dict] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -35,6 +35,8 @@ class TransactionResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     processed_at: Optional[datetime] = None
+    enqueued_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
     celery_task_id: Optional[str] = None
     error_message: Optional[str] = None
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Annotated
 from datetime import datetime
 from uuid import UUID
 
@@ -20,6 +20,22 @@ class WikipediaSearchRequest(BaseModel):
     )
 
 
+class BatchWikipediaSearchRequest(BaseModel):
+    """Schema para solicitar busquedas de un lote de terminos en Wikipedia."""
+    search_terms: List[Annotated[str, Field(min_length=1, max_length=500)]] = Field(
+        ...,
+        min_length=1,
+        max_length=300,
+        description="Terminos a buscar (maximo 300 por lote)"
+    )
+    max_tokens: Optional[int] = Field(
+        default=500,
+        ge=50,
+        le=2000,
+        description="Maximo de tokens para cada resumen"
+    )
+
+
 class WikipediaSearchResponse(BaseModel):
     """Schema de respuesta con resultado de Wikipedia y resumen."""
     id: UUID
@@ -35,8 +51,22 @@ class WikipediaSearchResponse(BaseModel):
         from_attributes = True
 
 
+class WikipediaHistoryItemResponse(BaseModel):
+    """Schema liviano para el listado del historial (sin texto extraido completo)."""
+    id: UUID
+    search_term: str
+    wikipedia_url: Optional[str] = None
+    extracted_text_preview: str
+    summary: str
+    model_used: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class WikipediaHistoryResponse(BaseModel):
-    """Schema para historial de busquedas Wikipedia."""
+    """Schema para el detalle de una busqueda Wikipedia (texto extraido completo)."""
     id: UUID
     search_term: str
     wikipedia_url: Optional[str] = None
@@ -47,3 +77,14 @@ class WikipediaHistoryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class WikipediaSearchHistoryResult(BaseModel):
+    """Schema de un resultado de busqueda full-text en el historial de Wikipedia."""
+    id: UUID
+    search_term: str
+    wikipedia_url: Optional[str] = None
+    summary_highlight: str
+    rank: float
+    model_used: Optional[str] = None
+    created_at: datetime
@@ -1,6 +1,12 @@
 """
 Script para crear el usuario seed permanente.
-Se ejecuta al iniciar la aplicación.
+
+Paso unico de despliegue, despues de las migraciones (no corre al iniciar
+la API, asi el arranque no consulta la base ni calcula un hash bcrypt):
+
+    alembic upgrade head && python -m app.seed
+
+Es idempotente: si el usuario ya existe no hace nada.
 """
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
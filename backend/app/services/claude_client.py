@@ -1,12 +1,72 @@
-import anthropic
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from app.config import settings
+from app.metrics import observe_upstream
+
+
+SYSTEM_PROMPT = """Eres un asistente especializado en crear resumenes concisos y precisos.
+Tu tarea es resumir el texto proporcionado de manera clara, manteniendo los puntos clave.
+El resumen debe ser en el mismo idioma que el texto original.
+No incluyas frases como "El texto habla de..." o "En resumen...".
+Ve directo al contenido resumido."""
+
+
+def resolve_mode(text: str, mode: str) -> str:
+    """Estrategia efectiva (single o map_reduce) para el texto; resuelve auto por largo."""
+    if mode == "auto":
+        return "map_reduce" if len(text) > settings.SUMMARIZE_LONG_THRESHOLD_CHARS else "single"
+    return mode
+
+
+def split_into_chunks(text: str, max_chars: int) -> list:
+    """
+    Divide el texto en bloques de hasta max_chars respetando los parrafos.
+
+    Los parrafos se agrupan mientras quepan en el bloque; un parrafo mas
+    largo que max_chars se corta en el ultimo espacio disponible.
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+    chunks = []
+    current = ""
+    for paragraph in paragraphs:
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+
+    if current:
+        chunks.append(current)
+
+    return chunks
 
 
 class ClaudeClient:
     """Cliente para interactuar con la API de Claude (Anthropic)."""
 
     def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        if settings.CLAUDE_BACKEND == "fake":
+            from app.services.fake_anthropic import FakeAnthropic
+            self.client = FakeAnthropic()
+        else:
+            # El SDK es pesado de importar: se carga con el primer cliente real
+            import anthropic
+            self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
         self.default_model = settings.CLAUDE_MODEL
 
     def summarize(self, text: str, max_tokens: int = 500) -> dict:
@@ -20,27 +80,141 @@ class ClaudeClient:
         Returns:
             dict con summary, model, tokens_input, tokens_output
         """
-        system_prompt = """Eres un asistente especializado en crear resumenes concisos y precisos.
-Tu tarea es resumir el texto proporcionado de manera clara, manteniendo los puntos clave.
-El resumen debe ser en el mismo idioma que el texto original.
-No incluyas frases como "El texto habla de..." o "En resumen...".
-Ve directo al contenido resumido."""
+        with observe_upstream("claude"):
+            message = self.client.messages.create(
+                model=self.default_model,
+                max_tokens=max_tokens,
+                system=SYSTEM_PROMPT,
+                messages=self._build_messages(text)
+            )
 
-        message = self.client.messages.create(
-            model=self.default_model,
-            max_tokens=max_tokens,
-            system=system_prompt,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"Resume el siguiente texto:\n\n{text}"
-                }
-            ]
+        return {
+            "summary": message.content[0].text,
+            "model": message.model,
+            "tokens_input": message.usage.input_tokens,
+            "tokens_output": message.usage.output_tokens
+        }
+
+    def summarize_with_mode(self, text: str, max_tokens: int = 500, mode: str = "auto") -> dict:
+        """
+        Resume con la estrategia indicada.
+
+        Args:
+            text: Texto a resumir
+            max_tokens: Maximo de tokens para la respuesta
+            mode: single (una llamada), map_reduce (por bloques) o auto
+                  (map_reduce si el texto supera SUMMARIZE_LONG_THRESHOLD_CHARS)
+        """
+        if resolve_mode(text, mode) == "map_reduce":
+            return self.summarize_map_reduce(text=text, max_tokens=max_tokens)
+        return self.summarize(text=text, max_tokens=max_tokens)
+
+    def summarize_map_reduce(
+        self,
+        text: str,
+        max_tokens: int = 500,
+        chunk_chars: int = None,
+        max_concurrency: int = None
+    ) -> dict:
+        """
+        Resume textos largos en dos etapas: map (bloques en paralelo) y reduce.
+
+        Args:
+            text: Texto a resumir
+            max_tokens: Maximo de tokens para cada resumen parcial y el final
+            chunk_chars: Tamano maximo de cada bloque (default: settings)
+            max_concurrency: Llamadas simultaneas en la etapa map (default: settings)
+
+        Returns:
+            dict con summary, model, tokens_input, tokens_output (totales)
+            y stages con tiempos y tokens de cada etapa
+        """
+        chunk_chars = chunk_chars or settings.SUMMARIZE_CHUNK_CHARS
+        max_concurrency = max_concurrency or settings.SUMMARIZE_MAX_CONCURRENCY
+
+        chunks = split_into_chunks(text, chunk_chars)
+        if len(chunks) <= 1:
+            return self.summarize(text=text, max_tokens=max_tokens)
+
+        # Etapa map: resumir cada bloque con concurrencia acotada
+        map_start = time.time()
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(chunks))) as executor:
+            partials = list(executor.map(
+                lambda chunk: self.summarize(text=chunk, max_tokens=max_tokens),
+                chunks
+            ))
+        map_time = int((time.time() - map_start) * 1000)
+
+        # Etapa reduce: combinar los resumenes parciales en uno final
+        reduce_start = time.time()
+        final = self.summarize(
+            text="\n\n".join(partial["summary"] for partial in partials),
+            max_tokens=max_tokens
         )
+        reduce_time = int((time.time() - reduce_start) * 1000)
+
+        map_tokens_input = sum(partial.get("tokens_input") or 0 for partial in partials)
+        map_tokens_output = sum(partial.get("tokens_output") or 0 for partial in partials)
 
         return {
-            "summary": message.content[0].text,
+            "summary": final["summary"],
+            "model": final["model"],
+            "tokens_input": map_tokens_input + (final.get("tokens_input") or 0),
+            "tokens_output": map_tokens_output + (final.get("tokens_output") or 0),
+            "stages": {
+                "map": {
+                    "chunks": len(chunks),
+                    "concurrency": min(max_concurrency, len(chunks)),
+                    "time_ms": map_time,
+                    "tokens_input": map_tokens_input,
+                    "tokens_output": map_tokens_output
+                },
+                "reduce": {
+                    "time_ms": reduce_time,
+                    "tokens_input": final.get("tokens_input"),
+                    "tokens_output": final.get("tokens_output")
+                }
+            }
+        }
+
+    def summarize_stream(self, text: str, max_tokens: int = 500):
+        """
+        Genera un resumen del texto emitiendo los fragmentos conforme llegan.
+
+        Args:
+            text: Texto a resumir
+            max_tokens: Maximo de tokens para la respuesta
+
+        Yields:
+            dict {"type": "delta", "text": ...} por cada fragmento generado y,
+            al final, {"type": "done", ...} con summary, model, tokens_input, tokens_output
+        """
+        # Mide el stream completo, hasta el mensaje final
+        with observe_upstream("claude_stream"), self.client.messages.stream(
+            model=self.default_model,
+            max_tokens=max_tokens,
+            system=SYSTEM_PROMPT,
+            messages=self._build_messages(text)
+        ) as stream:
+            for chunk in stream.text_stream:
+                yield {"type": "delta", "text": chunk}
+
+            message = stream.get_final_message()
+
+        yield {
+            "type": "done",
+            "summary": "".join(block.text for block in message.content if block.type == "text"),
             "model": message.model,
             "tokens_input": message.usage.input_tokens,
             "tokens_output": message.usage.output_tokens
         }
+
+    @staticmethod
+    def _build_messages(text: str) -> list:
+        """Construye el mensaje de usuario con el texto a resumir."""
+        return [
+            {
+                "role": "user",
+                "content": f"Resume el siguiente texto:\n\n{text}"
+            }
+        ]
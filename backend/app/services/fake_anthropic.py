@@ -0,0 +1,129 @@
+"""
+Backend simulado de Anthropic para pruebas de carga y benchmarks sin red.
+
+Implementa el subconjunto de la interfaz del SDK que usa ClaudeClient
+(`messages.create` y `messages.stream`) y responde con resumenes
+deterministas derivados del texto de entrada. La latencia, el ritmo de
+streaming y la tasa de errores se configuran con las variables FAKE_CLAUDE_*.
+"""
+import random
+import threading
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+
+from app.config import settings
+
+
+class FakeAnthropicError(Exception):
+    """Error simulado del API (equivalente a un 529/overloaded)."""
+
+
+class _LatencySampler:
+    """Muestrea latencias (segundos) segun la distribucion configurada."""
+
+    def __init__(self, distribution: str, mean_ms: float, spread_ms: float, seed: int):
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.spread_ms = spread_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self.lock:
+            if self.distribution == "uniform":
+                value = self.rng.uniform(self.mean_ms - self.spread_ms, self.mean_ms + self.spread_ms)
+            elif self.distribution == "normal":
+                value = self.rng.gauss(self.mean_ms, self.spread_ms)
+            elif self.distribution == "lognormal":
+                # Cola larga: mediana mean_ms, spread_ms controla la dispersion
+                sigma = self.spread_ms / self.mean_ms if self.mean_ms else 0
+                value = self.mean_ms * self.rng.lognormvariate(0, sigma)
+            else:
+                value = self.mean_ms
+        return max(value, 0) / 1000
+
+    def should_fail(self, error_rate: float) -> bool:
+        with self.lock:
+            return self.rng.random() < error_rate
+
+
+class _FakeStream:
+    """Context manager equivalente a `client.messages.stream(...)`."""
+
+    def __init__(self, messages: "_FakeMessages", message: SimpleNamespace):
+        self._messages = messages
+        self._message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        time.sleep(self._messages.sampler.sample())
+        words = self._message.content[0].text.split(" ")
+        for index, word in enumerate(words):
+            # ~1 token por palabra
+            time.sleep(self._messages.ms_per_token / 1000)
+            yield word if index == 0 else f" {word}"
+
+    def get_final_message(self) -> SimpleNamespace:
+        return self._message
+
+
+class _FakeMessages:
+    def __init__(self):
+        self.sampler = _LatencySampler(
+            distribution=settings.FAKE_CLAUDE_LATENCY_DISTRIBUTION,
+            mean_ms=settings.FAKE_CLAUDE_LATENCY_MS,
+            spread_ms=settings.FAKE_CLAUDE_LATENCY_SPREAD_MS,
+            seed=settings.FAKE_CLAUDE_SEED
+        )
+        self.ms_per_token = settings.FAKE_CLAUDE_MS_PER_TOKEN
+        self.error_rate = settings.FAKE_CLAUDE_ERROR_RATE
+
+    def _build_message(self, model: str, max_tokens: int, messages: list) -> SimpleNamespace:
+        if self.sampler.should_fail(self.error_rate):
+            raise FakeAnthropicError("Overloaded (error simulado por FAKE_CLAUDE_ERROR_RATE)")
+
+        content = messages[-1]["content"]
+        text = content.split("\n\n", 1)[-1]
+        words = text.split()
+
+        tokens_input = max(1, len(content) // 4)
+        tokens_output = min(max_tokens, max(16, tokens_input // 8))
+        summary = " ".join(words[:tokens_output]) or "Resumen simulado."
+
+        return SimpleNamespace(
+            model=model,
+            content=[SimpleNamespace(type="text", text=summary)],
+            usage=SimpleNamespace(input_tokens=tokens_input, output_tokens=len(summary.split()))
+        )
+
+    def create(self, model: str, max_tokens: int, messages: list, **kwargs) -> SimpleNamespace:
+        message = self._build_message(model, max_tokens, messages)
+        time.sleep(
+            self.sampler.sample()
+            + message.usage.output_tokens * self.ms_per_token / 1000
+        )
+        return message
+
+    def stream(self, model: str, max_tokens: int, messages: list, **kwargs) -> _FakeStream:
+        return _FakeStream(self, self._build_message(model, max_tokens, messages))
+
+
+@lru_cache
+def _shared_messages() -> _FakeMessages:
+    # Compartido por todo el proceso para que la secuencia de latencias y
+    # errores dependa solo de FAKE_CLAUDE_SEED y no de cada request
+    return _FakeMessages()
+
+
+class FakeAnthropic:
+    """Sustituto en proceso de `anthropic.Anthropic` (CLAUDE_BACKEND=fake)."""
+
+    def __init__(self, **kwargs):
+        self.messages = _shared_messages()
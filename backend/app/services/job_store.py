@@ -0,0 +1,86 @@
+"""
+Estado de jobs en background (progreso y resultados) guardado en Redis.
+
+Cada job es un hash `job:{id}` con contadores de progreso y una lista
+`job:{id}:results` con el resultado de cada elemento procesado.
+"""
+import json
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+import redis
+
+from app.config import settings
+
+
+JOB_KEY = "job:{job_id}"
+JOB_RESULTS_KEY = "job:{job_id}:results"
+
+
+@lru_cache
+def _get_redis() -> redis.Redis:
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+def create_job(kind: str, user_id: str, total: int) -> str:
+    """Registra un job nuevo en estado 'pendiente' y retorna su id."""
+    job_id = str(uuid.uuid4())
+    key = JOB_KEY.format(job_id=job_id)
+
+    r = _get_redis()
+    r.hset(key, mapping={
+        "job_id": job_id,
+        "kind": kind,
+        "user_id": str(user_id),
+        "status": "pendiente",
+        "total": total,
+        "completed": 0,
+        "failed": 0,
+        "created_at": datetime.utcnow().isoformat()
+    })
+    r.expire(key, settings.JOB_TTL_SECONDS)
+    return job_id
+
+
+def update_job(job_id: str, **fields):
+    """Actualiza campos del job (status, finished_at, error...)."""
+    _get_redis().hset(JOB_KEY.format(job_id=job_id), mapping={
+        name: value.isoformat() if isinstance(value, datetime) else value
+        for name, value in fields.items()
+    })
+
+
+def record_results(job_id: str, results: list):
+    """Agrega resultados al job y actualiza los contadores de progreso."""
+    if not results:
+        return
+
+    key = JOB_KEY.format(job_id=job_id)
+    results_key = JOB_RESULTS_KEY.format(job_id=job_id)
+    failed = sum(1 for result in results if result.get("error"))
+
+    pipe = _get_redis().pipeline()
+    pipe.rpush(results_key, *[json.dumps(result) for result in results])
+    pipe.expire(results_key, settings.JOB_TTL_SECONDS)
+    pipe.hincrby(key, "completed", len(results) - failed)
+    pipe.hincrby(key, "failed", failed)
+    pipe.execute()
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """Obtiene el estado del job con sus resultados, o None si no existe."""
+    r = _get_redis()
+    job = r.hgetall(JOB_KEY.format(job_id=job_id))
+    if not job:
+        return None
+
+    for counter in ("total", "completed", "failed"):
+        job[counter] = int(job.get(counter, 0))
+
+    job["results"] = [
+        json.loads(result)
+        for result in r.lrange(JOB_RESULTS_KEY.format(job_id=job_id), 0, -1)
+    ]
+    return job
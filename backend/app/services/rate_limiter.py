@@ -0,0 +1,196 @@
+"""
+Limitador token-bucket en Redis para las llamadas a Claude.
+
+Cada llamada consume de cuatro cubetas a la vez: requests y tokens del
+usuario, y requests y tokens globales. Los tokens se cobran con una
+estimacion antes de llamar al modelo y se reconcilian con el uso real
+(tokens_input + tokens_output) al terminar.
+"""
+import time
+from functools import lru_cache
+from typing import Optional
+
+import redis
+
+from app.config import settings
+
+
+BUCKET_KEY = "ratelimit:{scope}:{kind}"
+
+# Lua: verifica todas las cubetas y solo descuenta si todas alcanzan.
+# Retorna "0" si se admitio o los segundos a esperar para la mas restrictiva.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local cost = tonumber(ARGV[(i - 1) * 3 + 3])
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local cost = tonumber(ARGV[(i - 1) * 3 + 3])
+    redis.call('HSET', key, 'tokens', levels[i] - cost, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) * 2)
+end
+return "0"
+"""
+
+# Lua: ajusta las cubetas con la diferencia entre lo estimado y lo real
+# (delta positivo devuelve tokens, negativo cobra el excedente).
+_RECONCILE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[(i - 1) * 3 + 1])
+    local rate = tonumber(ARGV[(i - 1) * 3 + 2])
+    local delta = tonumber(ARGV[(i - 1) * 3 + 3])
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate + delta)
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) * 2)
+end
+return "0"
+"""
+
+
+class RateLimitExceeded(Exception):
+    """El presupuesto no alcanza dentro del tiempo de espera permitido."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Limite de uso excedido, reintentar en {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@lru_cache
+def _get_redis() -> redis.Redis:
+    return redis.from_url(settings.REDIS_URL)
+
+
+@lru_cache
+def _scripts():
+    r = _get_redis()
+    return r.register_script(_ACQUIRE_SCRIPT), r.register_script(_RECONCILE_SCRIPT)
+
+
+def estimate_tokens(text: str, max_tokens: int) -> int:
+    """Estimacion conservadora de tokens (~4 caracteres por token + salida maxima)."""
+    return len(text) // 4 + max_tokens
+
+
+def result_tokens(result: dict) -> int:
+    """Tokens reales de una respuesta de ClaudeClient (entrada + salida)."""
+    return (result.get("tokens_input") or 0) + (result.get("tokens_output") or 0)
+
+
+def _token_buckets(user_id: str) -> list:
+    """(key, capacidad, tokens/segundo) de las cubetas de tokens."""
+    return [
+        (BUCKET_KEY.format(scope=f"user:{user_id}", kind="tokens"),
+         settings.RATE_LIMIT_USER_TOKENS_PER_MINUTE,
+         settings.RATE_LIMIT_USER_TOKENS_PER_MINUTE / 60),
+        (BUCKET_KEY.format(scope="global", kind="tokens"),
+         settings.RATE_LIMIT_GLOBAL_TOKENS_PER_MINUTE,
+         settings.RATE_LIMIT_GLOBAL_TOKENS_PER_MINUTE / 60),
+    ]
+
+
+def _request_buckets(user_id: str) -> list:
+    """(key, capacidad, requests/segundo) de las cubetas de requests."""
+    return [
+        (BUCKET_KEY.format(scope=f"user:{user_id}", kind="requests"),
+         settings.RATE_LIMIT_USER_REQUESTS_PER_MINUTE,
+         settings.RATE_LIMIT_USER_REQUESTS_PER_MINUTE / 60),
+        (BUCKET_KEY.format(scope="global", kind="requests"),
+         settings.RATE_LIMIT_GLOBAL_REQUESTS_PER_MINUTE,
+         settings.RATE_LIMIT_GLOBAL_REQUESTS_PER_MINUTE / 60),
+    ]
+
+
+def acquire(user_id, estimated_tokens: int, max_wait: Optional[float] = None) -> Optional[dict]:
+    """
+    Reserva un request y estimated_tokens del presupuesto del usuario y global.
+
+    Si no alcanza, espera (encola) hasta max_wait segundos; max_wait=None usa
+    RATE_LIMIT_MAX_WAIT_SECONDS y un valor negativo espera indefinidamente.
+
+    Returns:
+        Reserva para pasar a reconcile(), o None si el limitador esta
+        deshabilitado o Redis no responde (se permite la llamada)
+
+    Raises:
+        RateLimitExceeded con retry_after si se agota el tiempo de espera
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+
+    if max_wait is None:
+        max_wait = settings.RATE_LIMIT_MAX_WAIT_SECONDS
+
+    buckets = _request_buckets(user_id) + _token_buckets(user_id)
+    costs = [1, 1] + [estimated_tokens, estimated_tokens]
+
+    keys = [key for key, _, _ in buckets]
+    # Un costo mayor que la capacidad nunca se admitiria: se cobra el tope
+    charged = [min(cost, capacity) for (_, capacity, _), cost in zip(buckets, costs)]
+    args = []
+    for (key, capacity, rate), cost in zip(buckets, charged):
+        args += [capacity, rate, cost]
+
+    acquire_script, _ = _scripts()
+    deadline = time.monotonic() + max_wait
+
+    while True:
+        try:
+            wait = float(acquire_script(keys=keys, args=args))
+        except redis.RedisError as e:
+            print(f"[RATE-LIMIT] Redis no disponible, se omite el limite: {e}")
+            return None
+
+        if wait <= 0:
+            # Tokens cobrados en cada cubeta de tokens (user, global): reconcile
+            # devuelve o cobra respecto de lo cobrado, no de la estimacion
+            return {"user_id": str(user_id), "tokens": charged[2:]}
+
+        remaining = deadline - time.monotonic()
+        if max_wait >= 0 and wait > remaining:
+            raise RateLimitExceeded(retry_after=wait)
+
+        time.sleep(wait if max_wait < 0 else min(wait, remaining))
+
+
+def reconcile(reservation: Optional[dict], actual_tokens: Optional[int]):
+    """Ajusta el presupuesto de tokens con el uso real de la llamada."""
+    if not reservation or actual_tokens is None:
+        return
+
+    deltas = [charged - actual_tokens for charged in reservation["tokens"]]
+    if not any(deltas):
+        return
+
+    buckets = _token_buckets(reservation["user_id"])
+    args = []
+    for (_, capacity, rate), delta in zip(buckets, deltas):
+        args += [capacity, rate, delta]
+
+    _, reconcile_script = _scripts()
+    try:
+        reconcile_script(keys=[key for key, _, _ in buckets], args=args)
+    except redis.RedisError as e:
+        print(f"[RATE-LIMIT] Error reconciliando tokens: {e}")
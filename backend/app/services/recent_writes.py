@@ -0,0 +1,39 @@
+"""
+Marca en Redis de los usuarios que escribieron hace poco (read-your-writes).
+
+Cada request de escritura de un usuario deja `recent_write:{user_id}` con TTL
+READ_YOUR_WRITES_SECONDS; mientras exista, sus lecturas van al primario en
+lugar de a una replica que todavia podria no tener esa escritura. Si Redis no
+responde se asume una escritura reciente: se pierde la descarga de lecturas,
+no la consistencia.
+"""
+from functools import lru_cache
+
+import redis
+
+from app.config import settings
+
+
+RECENT_WRITE_KEY = "recent_write:{user_id}"
+
+
+@lru_cache
+def _get_redis() -> redis.Redis:
+    return redis.from_url(settings.REDIS_URL, decode_responses=True, socket_timeout=1)
+
+
+def mark_write(user_id):
+    """Registra que el usuario acaba de escribir (renueva el TTL)."""
+    try:
+        _get_redis().set(RECENT_WRITE_KEY.format(user_id=user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+    except redis.RedisError as e:
+        print(f"[RECENT-WRITES] Error marcando escritura: {e}")
+
+
+def wrote_recently(user_id) -> bool:
+    """True si el usuario escribio dentro de la ventana READ_YOUR_WRITES_SECONDS."""
+    try:
+        return bool(_get_redis().exists(RECENT_WRITE_KEY.format(user_id=user_id)))
+    except redis.RedisError as e:
+        print(f"[RECENT-WRITES] Redis no disponible, se lee del primario: {e}")
+        return True
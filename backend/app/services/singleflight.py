@@ -0,0 +1,143 @@
+"""
+Coalescencia de llamadas identicas concurrentes (single-flight).
+
+Cuando varias requests piden lo mismo a la vez (mismo termino de Wikipedia,
+mismo texto a resumir), solo una ejecuta la llamada costosa y las demas
+esperan y comparten su resultado:
+
+- En el proceso: un registro de llamadas en vuelo por clave
+- Entre procesos/workers: un lock en Redis (SET NX PX) y el resultado
+  publicado en Redis por unos segundos para quienes esperan
+
+Si la llamada lider falla, quienes esperaban la ejecutan por su cuenta
+(el error de un usuario, p. ej. su limite de uso, no se comparte). Si Redis
+no responde se coordina solo dentro del proceso. Los resultados deben ser
+serializables a JSON.
+"""
+import json
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import redis
+
+from app.config import settings
+
+
+LOCK_KEY = "singleflight:{key}:lock"
+RESULT_KEY = "singleflight:{key}:result"
+
+# Lua: libera el lock solo si sigue siendo del lider que lo tomo
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_MISSING = object()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = _MISSING
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+@lru_cache
+def _get_redis() -> redis.Redis:
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+@lru_cache
+def _release_script():
+    return _get_redis().register_script(_RELEASE_SCRIPT)
+
+
+def run(key: str, fn: Callable[[], Any]) -> Any:
+    """
+    Ejecuta fn() una sola vez para todas las llamadas concurrentes con `key`
+    y retorna su resultado a cada una.
+    """
+    if not settings.SINGLEFLIGHT_ENABLED:
+        return fn()
+
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _inflight[key] = call
+
+    if not leader:
+        call.done.wait(settings.SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS)
+        if call.result is not _MISSING:
+            return call.result
+        # El lider fallo o tardo demasiado: ejecutar por cuenta propia
+        return _run_distributed(key, fn)
+
+    try:
+        call.result = _run_distributed(key, fn)
+        return call.result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+def _run_distributed(key: str, fn: Callable[[], Any]) -> Any:
+    """Coordina entre procesos con un lock en Redis; ejecuta fn() si es lider."""
+    lock_key = LOCK_KEY.format(key=key)
+    result_key = RESULT_KEY.format(key=key)
+    token = str(uuid.uuid4())
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_WAIT_TIMEOUT_SECONDS
+
+    try:
+        r = _get_redis()
+        while True:
+            if r.set(lock_key, token, nx=True, px=int(settings.SINGLEFLIGHT_LOCK_TTL_SECONDS * 1000)):
+                break
+
+            # Otro proceso esta calculando: esperar su resultado
+            shared = _wait_result(r, lock_key, result_key, deadline)
+            if shared is not _MISSING:
+                return shared
+            if time.monotonic() >= deadline:
+                return fn()
+            # El lider libero el lock sin publicar resultado (fallo): reintentar el lock
+    except redis.RedisError as e:
+        print(f"[SINGLEFLIGHT] Redis no disponible, coordinando solo en el proceso: {e}")
+        return fn()
+
+    try:
+        result = fn()
+        try:
+            r.set(result_key, json.dumps(result), ex=settings.SINGLEFLIGHT_RESULT_TTL_SECONDS)
+        except (redis.RedisError, TypeError) as e:
+            print(f"[SINGLEFLIGHT] No se pudo publicar el resultado de '{key}': {e}")
+        return result
+    finally:
+        try:
+            _release_script()(keys=[lock_key], args=[token])
+        except redis.RedisError as e:
+            print(f"[SINGLEFLIGHT] Error liberando lock de '{key}': {e}")
+
+
+def _wait_result(r: redis.Redis, lock_key: str, result_key: str, deadline: float) -> Optional[Any]:
+    """Espera (polling) el resultado publicado mientras el lock siga tomado."""
+    while time.monotonic() < deadline:
+        raw = r.get(result_key)
+        if raw is not None:
+            return json.loads(raw)
+        if not r.exists(lock_key):
+            # Puede haberse publicado justo antes de liberar el lock
+            raw = r.get(result_key)
+            return json.loads(raw) if raw is not None else _MISSING
+        time.sleep(settings.SINGLEFLIGHT_POLL_INTERVAL_SECONDS)
+    return _MISSING
@@ -0,0 +1,60 @@
+"""
+Cache en Redis de resumenes de Claude por contenido.
+
+La clave combina modelo, max_tokens, el prompt de sistema y el SHA-256 del
+texto, asi que un mismo texto resumido con la misma configuracion se
+responde sin llamar al modelo. Si Redis no responde se omite la cache.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from typing import Optional
+
+import redis
+
+from app.config import settings
+from app.services.claude_client import SYSTEM_PROMPT
+from app.services.text_blobs import text_hash
+
+
+SUMMARY_KEY = "summary:{model}:{prompt}:{max_tokens}:{text}"
+
+# Cambia si cambia el prompt de sistema, invalidando los resumenes anteriores
+_PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+@lru_cache
+def _get_redis() -> redis.Redis:
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+def cache_key(text: str, max_tokens: int) -> str:
+    """Clave del resumen de `text` con la configuracion actual del modelo."""
+    return SUMMARY_KEY.format(
+        model=settings.CLAUDE_MODEL,
+        prompt=_PROMPT_VERSION,
+        max_tokens=max_tokens,
+        text=text_hash(text)
+    )
+
+
+def get(text: str, max_tokens: int) -> Optional[dict]:
+    """Resultado de ClaudeClient.summarize guardado para el texto, o None."""
+    if not settings.SUMMARY_CACHE_ENABLED:
+        return None
+    try:
+        raw = _get_redis().get(cache_key(text, max_tokens))
+    except redis.RedisError as e:
+        print(f"[SUMMARY-CACHE] Redis no disponible, se omite la cache: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+def put(text: str, max_tokens: int, result: dict):
+    """Guarda el resultado de ClaudeClient.summarize para el texto."""
+    if not settings.SUMMARY_CACHE_ENABLED:
+        return
+    try:
+        _get_redis().set(cache_key(text, max_tokens), json.dumps(result), ex=settings.SUMMARY_CACHE_TTL_SECONDS)
+    except redis.RedisError as e:
+        print(f"[SUMMARY-CACHE] Error guardando en cache: {e}")
@@ -0,0 +1,42 @@
+"""
+Almacenamiento deduplicado de textos grandes (tabla text_blobs).
+
+Los logs guardan solo el hash SHA-256 del texto; el contenido se inserta una
+vez por hash con INSERT ... ON CONFLICT DO NOTHING.
+"""
+import hashlib
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.text_blob import TextBlob
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex del texto en UTF-8 (igual a encode(sha256(convert_to(t, 'UTF8')), 'hex'))."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def store_text(db: Session, text: str) -> str:
+    """Guarda el texto si no existe y retorna su hash. No hace commit."""
+    return store_texts(db, [text])[0]
+
+
+def store_texts(db: Session, texts: list) -> list:
+    """Guarda varios textos en un solo INSERT (deduplicados) y retorna sus hashes en orden. No hace commit."""
+    hashes = [text_hash(text) for text in texts]
+
+    unique = {}
+    for digest, text in zip(hashes, texts):
+        unique.setdefault(digest, text)
+
+    if unique:
+        db.execute(
+            insert(TextBlob).on_conflict_do_nothing(index_elements=["hash"]),
+            [
+                {"hash": digest, "content": text, "size_bytes": len(text.encode("utf-8"))}
+                for digest, text in unique.items()
+            ]
+        )
+
+    return hashes
@@ -0,0 +1,190 @@
+"""
+Pool acotado de WebDrivers precalentados.
+
+Arrancar Chromium headless es el costo dominante de cada scraping; el pool
+mantiene hasta `size` drivers vivos y los reutiliza entre requests.
+
+- Un driver se recicla despues de `max_pages` paginas (el reemplazo arranca en segundo plano)
+- Si una pagina falla, el driver se verifica y, si no responde, se descarta y se repone en segundo plano
+- checkout() espera como maximo `checkout_timeout` segundos
+- stats() expone el tiempo de espera del checkout y los contadores del pool
+
+Selenium no se importa aca: el pool solo conoce a `factory`, asi crear el
+pool (health check, arranque de la API) no carga Selenium.
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+
+class WebDriverPoolTimeout(Exception):
+    """No se libero ningun driver dentro del tiempo de espera."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"No hay navegadores disponibles (espera de {timeout:.1f}s agotada)")
+        self.timeout = timeout
+
+
+class WebDriverPool:
+    """Pool thread-safe de drivers creados con `factory`."""
+
+    def __init__(self, factory: Callable, size: int, max_pages: int, checkout_timeout: float):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._stats = {
+            "checkouts": 0,
+            "checkout_wait_seconds_total": 0.0,
+            "checkout_wait_seconds_max": 0.0,
+            "checkout_timeouts": 0,
+            "drivers_started": 0,
+            "drivers_recycled": 0,
+            "drivers_discarded": 0,
+        }
+
+    def warm(self, count: int = None):
+        """Arranca drivers hasta tener `count` (por defecto `size`) listos en el pool."""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._lock:
+                if self._closed or self._created >= count:
+                    return
+                self._created += 1
+            try:
+                driver = self._start()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            self._idle.put(driver)
+
+    def checkout(self):
+        """Toma un driver libre, arranca uno nuevo si hay cupo, o espera hasta checkout_timeout."""
+        start = time.monotonic()
+        driver = None
+
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_start = self._created < self.size
+                if can_start:
+                    self._created += 1
+            if can_start:
+                try:
+                    driver = self._start()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    driver = self._idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats["checkout_timeouts"] += 1
+                    raise WebDriverPoolTimeout(self.checkout_timeout)
+
+        wait = time.monotonic() - start
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["checkout_wait_seconds_total"] += wait
+            self._stats["checkout_wait_seconds_max"] = max(self._stats["checkout_wait_seconds_max"], wait)
+        return driver
+
+    def checkin(self, driver, failed: bool = False):
+        """Devuelve el driver al pool; lo recicla si alcanzo max_pages o si fallo y no responde."""
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            pages = self._pages[id(driver)]
+            closed = self._closed
+
+        if closed:
+            self._discard(driver)
+        elif failed and not self._is_healthy(driver):
+            self._discard(driver, stat="drivers_discarded")
+            # Los checkouts que ya esperan en _idle.get no ven el cupo liberado:
+            # sin reponer agotarian la espera con el pool por debajo de size
+            threading.Thread(target=self._replenish, daemon=True).start()
+        elif pages >= self.max_pages:
+            self._discard(driver, stat="drivers_recycled")
+            # Reponer en segundo plano para que el siguiente checkout no pague el arranque
+            threading.Thread(target=self._replenish, daemon=True).start()
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        """Context manager: checkout al entrar, checkin al salir (marcando si hubo error)."""
+        driver = self.checkout()
+        failed = False
+        try:
+            yield driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.checkin(driver, failed=failed)
+
+    def close(self):
+        """Cierra los drivers libres; los que esten en uso se cierran al devolverse."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["started"] = self._created
+            stats["idle"] = self._idle.qsize()
+        stats["checkout_wait_seconds_avg"] = (
+            stats["checkout_wait_seconds_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        )
+        return stats
+
+    def _replenish(self):
+        try:
+            self.warm()
+        except Exception as e:
+            print(f"[WEBDRIVER-POOL] Error reponiendo driver: {e}")
+
+    def _start(self):
+        driver = self.factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+            self._stats["drivers_started"] += 1
+        return driver
+
+    def _discard(self, driver, stat: str = None):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+            if stat:
+                self._stats[stat] += 1
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"[WEBDRIVER-POOL] Error cerrando driver: {e}")
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
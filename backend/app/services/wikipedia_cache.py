@@ -0,0 +1,102 @@
+"""
+Cache en Redis de articulos de Wikipedia extraidos ({url, title, text}).
+
+- Clave por termino normalizado (espacios colapsados, sin mayusculas)
+- Fresco durante WIKIPEDIA_CACHE_TTL_SECONDS; despues se conserva hasta
+  WIKIPEDIA_CACHE_STALE_SECONDS mas y se revalida comparando la revision de
+  MediaWiki (una consulta liviana) antes de volver a extraer el articulo
+- "Articulo no encontrado" se cachea por WIKIPEDIA_NEGATIVE_CACHE_TTL_SECONDS
+- Si Redis no responde se extrae sin cache
+"""
+import json
+import time
+from functools import lru_cache
+from typing import Callable, Optional
+
+import redis
+
+from app.config import settings
+from app.services import wikipedia_http
+from app.services.wikipedia_http import ArticleNotFoundError
+
+
+ARTICLE_KEY = "wikipedia:article:{term}"
+
+
+@lru_cache
+def _get_redis() -> redis.Redis:
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+def normalize_term(search_term: str) -> str:
+    """Termino normalizado para la clave de cache."""
+    return " ".join(search_term.split()).casefold()
+
+
+def cache_key(search_term: str) -> str:
+    """Clave de cache (y de coalescencia) del articulo de un termino."""
+    return ARTICLE_KEY.format(term=normalize_term(search_term))
+
+
+def get_article(search_term: str, extract: Callable[[str], dict]) -> dict:
+    """
+    Retorna el articulo desde cache o lo extrae con `extract(search_term)`.
+
+    Raises:
+        ArticleNotFoundError si el articulo no existe (tambien desde cache)
+        Las excepciones de `extract`
+    """
+    if not settings.WIKIPEDIA_CACHE_ENABLED:
+        return extract(search_term)
+
+    key = cache_key(search_term)
+    entry = _read(key)
+
+    if entry and entry.get("missing"):
+        raise ArticleNotFoundError(search_term)
+
+    if entry:
+        article = entry["article"]
+        if time.time() - entry["cached_at"] < settings.WIKIPEDIA_CACHE_TTL_SECONDS:
+            return article
+
+        if article.get("revision") is not None:
+            try:
+                revision = wikipedia_http.fetch_revision(article["title"])
+            except Exception as e:
+                # Sin poder revalidar se sirve la copia vencida
+                print(f"[WIKIPEDIA-CACHE] No se pudo revalidar '{search_term}': {e}")
+                return article
+
+            if revision == article["revision"]:
+                _write(key, {"article": article, "cached_at": time.time()}, _article_ttl())
+                return article
+
+    try:
+        article = extract(search_term)
+    except ArticleNotFoundError:
+        _write(key, {"missing": True, "cached_at": time.time()}, settings.WIKIPEDIA_NEGATIVE_CACHE_TTL_SECONDS)
+        raise
+
+    _write(key, {"article": article, "cached_at": time.time()}, _article_ttl())
+    return article
+
+
+def _article_ttl() -> int:
+    return settings.WIKIPEDIA_CACHE_TTL_SECONDS + settings.WIKIPEDIA_CACHE_STALE_SECONDS
+
+
+def _read(key: str) -> Optional[dict]:
+    try:
+        raw = _get_redis().get(key)
+    except redis.RedisError as e:
+        print(f"[WIKIPEDIA-CACHE] Redis no disponible, se omite la cache: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+def _write(key: str, entry: dict, ttl: int):
+    try:
+        _get_redis().set(key, json.dumps(entry), ex=ttl)
+    except redis.RedisError as e:
+        print(f"[WIKIPEDIA-CACHE] Error guardando en cache: {e}")
@@ -0,0 +1,164 @@
+"""
+Extraccion rapida de articulos de Wikipedia por HTTP (sin navegador).
+
+Pide la seccion inicial del articulo al API de MediaWiki (action=parse) con
+un cliente httpx compartido (conexiones keep-alive) y la parsea con
+selectolax. Usa las mismas reglas de seleccion de parrafo que el scraping
+con Selenium, que queda como respaldo si este camino falla.
+
+httpx y selectolax se importan en el primer uso para no sumarlos al
+arranque del proceso.
+"""
+import urllib.parse
+from functools import lru_cache
+from typing import List, Optional
+
+from app.config import settings
+from app.metrics import observe_upstream
+
+
+WIKIPEDIA_API_URL = "https://es.wikipedia.org/w/api.php"
+ARTICLE_URL = "https://es.wikipedia.org/wiki/{title}"
+USER_AGENT = "LegalarioTransactions/1.0 (extraccion de articulos) python-httpx"
+
+PARAGRAPH_SELECTOR = ".mw-parser-output > p"
+
+# Codigos de error de action=parse que significan "no hay articulo"
+NOT_FOUND_ERRORS = {"missingtitle", "invalidtitle", "nosuchpageid"}
+
+
+class ArticleNotFoundError(Exception):
+    """Wikipedia no tiene un articulo para el termino buscado."""
+
+    def __init__(self, search_term: str):
+        super().__init__(f"No se encontro articulo para: {search_term}")
+        self.search_term = search_term
+
+
+def select_first_paragraph(texts: List[str]) -> str:
+    """
+    Elige el primer parrafo util: el primero con mas de 50 caracteres que no
+    sea de coordenadas, o si no hay, el primero con mas de 20. "" si ninguno.
+    """
+    texts = [text.strip() for text in texts]
+
+    for text in texts:
+        # Ignorar parrafos vacios o muy cortos (coordenadas, etc.)
+        if text and len(text) > 50 and not text.startswith("Coordenadas"):
+            return text
+
+    # Intentar obtener cualquier parrafo con contenido
+    for text in texts:
+        if text and len(text) > 20:
+            return text
+
+    return ""
+
+
+def parse_paragraphs(html: str) -> List[str]:
+    """Textos de los parrafos de primer nivel del contenido del articulo."""
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    # Estilos de plantillas (TemplateStyles) y scripts no son texto visible
+    tree.strip_tags(["style", "script", "link"])
+
+    return [
+        " ".join(node.text(deep=True, separator="").split())
+        for node in tree.css(PARAGRAPH_SELECTOR)
+    ]
+
+
+def parse_response(data: dict, search_term: str) -> dict:
+    """
+    Convierte una respuesta JSON de action=parse (formatversion=2) en el
+    resultado de la extraccion.
+
+    Raises:
+        ArticleNotFoundError si el articulo no existe
+        Exception si la respuesta no trae un parrafo utilizable
+    """
+    error = data.get("error")
+    if error:
+        if error.get("code") in NOT_FOUND_ERRORS:
+            raise ArticleNotFoundError(search_term)
+        raise Exception(f"Error del API de Wikipedia: {error.get('info') or error.get('code')}")
+
+    parsed = data["parse"]
+    first_paragraph = select_first_paragraph(parse_paragraphs(parsed["text"]))
+    if not first_paragraph:
+        raise Exception(f"No se pudo extraer contenido del articulo: {search_term}")
+
+    title = parsed["title"]
+    return {
+        "url": ARTICLE_URL.format(title=urllib.parse.quote(title.replace(" ", "_"))),
+        "text": first_paragraph,
+        "title": title,
+        "revision": parsed.get("revid"),
+        "source": "http"
+    }
+
+
+@lru_cache
+def _get_client():
+    # Cliente compartido por el proceso: reutiliza conexiones TLS entre requests
+    import httpx
+
+    return httpx.Client(
+        timeout=settings.WIKIPEDIA_HTTP_TIMEOUT_SECONDS,
+        headers={"User-Agent": USER_AGENT},
+        limits=httpx.Limits(
+            max_connections=settings.WIKIPEDIA_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.WIKIPEDIA_HTTP_MAX_CONNECTIONS
+        )
+    )
+
+
+def fetch_article(search_term: str) -> dict:
+    """
+    Busca un termino en Wikipedia (espanol) via API y extrae el primer parrafo
+    de la seccion inicial (sigue redirecciones).
+
+    Returns:
+        dict con url, text, title, revision (revid de MediaWiki) y source
+
+    Raises:
+        ArticleNotFoundError si el articulo no existe
+        Exception ante errores de red, HTTP o de contenido
+    """
+    with observe_upstream("wikipedia_http"):
+        response = _get_client().get(WIKIPEDIA_API_URL, params={
+            "action": "parse",
+            "page": search_term,
+            "prop": "text|revid",
+            "section": 0,
+            "redirects": 1,
+            "disableeditsection": 1,
+            "disablelimitreport": 1,
+            "disabletoc": 1,
+            "format": "json",
+            "formatversion": 2,
+        })
+        response.raise_for_status()
+    return parse_response(response.json(), search_term)
+
+
+def fetch_revision(title: str) -> Optional[int]:
+    """
+    Revision actual (lastrevid) de un articulo, para revalidar una copia en
+    cache sin volver a descargar ni parsear el contenido. None si no existe.
+    """
+    response = _get_client().get(WIKIPEDIA_API_URL, params={
+        "action": "query",
+        "prop": "info",
+        "titles": title,
+        "redirects": 1,
+        "format": "json",
+        "formatversion": 2,
+    })
+    response.raise_for_status()
+
+    pages = response.json().get("query", {}).get("pages", [])
+    if not pages or pages[0].get("missing") or pages[0].get("invalid"):
+        return None
+    return pages[0].get("lastrevid")
@@ -1,42 +1,100 @@
 import os
 import urllib.parse
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from functools import lru_cache
+
+from app.config import settings
+from app.metrics import observe_upstream
+from app.services.webdriver_pool import WebDriverPool
+from app.services import wikipedia_http
+from app.services.wikipedia_http import ArticleNotFoundError, select_first_paragraph
+
+# Recursos que no se necesitan para leer el texto del articulo
+# (Wikipedia sirve el CSS por load.php?...&only=styles)
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.css", "*only=styles*",
+    "*upload.wikimedia.org*",
+]
+
+
+# Selenium se importa dentro de las funciones que lo usan: solo hace falta
+# cuando se arranca un navegador (fallback del camino HTTP)
+
+
+def _build_options():
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-software-rasterizer')
+
+    if settings.WEBDRIVER_BLOCK_ASSETS:
+        # No esperar imagenes ni hojas de estilo: basta con el DOM (DOMContentLoaded)
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+
+    # Usar Chromium del sistema en Docker
+    chrome_bin = os.environ.get('CHROME_BIN', '/usr/bin/chromium')
+    if os.path.exists(chrome_bin):
+        options.binary_location = chrome_bin
+
+    return options
+
+
+def _create_driver():
+    """Crear instancia del driver de Chrome/Chromium."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    options = _build_options()
+    chromedriver_path = os.environ.get('CHROMEDRIVER_PATH', '/usr/bin/chromedriver')
+
+    if os.path.exists(chromedriver_path):
+        service = Service(executable_path=chromedriver_path)
+        driver = webdriver.Chrome(service=service, options=options)
+    else:
+        # Fallback: dejar que Selenium encuentre el driver
+        driver = webdriver.Chrome(options=options)
+
+    if settings.WEBDRIVER_BLOCK_ASSETS:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+    return driver
+
+
+@lru_cache
+def get_driver_pool() -> WebDriverPool:
+    """Pool de drivers compartido por el proceso (API o worker de Celery)."""
+    return WebDriverPool(
+        factory=_create_driver,
+        size=settings.WEBDRIVER_POOL_SIZE,
+        max_pages=settings.WEBDRIVER_MAX_PAGES,
+        checkout_timeout=settings.WEBDRIVER_CHECKOUT_TIMEOUT_SECONDS
+    )
 
 
 class WikipediaScraper:
-    """Servicio para extraer informacion de Wikipedia usando Selenium headless."""
-
-    def __init__(self):
-        self.options = Options()
-        self.options.add_argument('--headless')
-        self.options.add_argument('--no-sandbox')
-        self.options.add_argument('--disable-dev-shm-usage')
-        self.options.add_argument('--disable-gpu')
-        self.options.add_argument('--window-size=1920,1080')
-        self.options.add_argument('--disable-extensions')
-        self.options.add_argument('--disable-software-rasterizer')
-
-        # Usar Chromium del sistema en Docker
-        chrome_bin = os.environ.get('CHROME_BIN', '/usr/bin/chromium')
-        if os.path.exists(chrome_bin):
-            self.options.binary_location = chrome_bin
-
-    def _create_driver(self):
-        """Crear instancia del driver de Chrome/Chromium."""
-        chromedriver_path = os.environ.get('CHROMEDRIVER_PATH', '/usr/bin/chromedriver')
-
-        if os.path.exists(chromedriver_path):
-            service = Service(executable_path=chromedriver_path)
-            return webdriver.Chrome(service=service, options=self.options)
-        else:
-            # Fallback: dejar que Selenium encuentre el driver
-            return webdriver.Chrome(options=self.options)
+    """
+    Servicio para extraer informacion de Wikipedia.
+
+    Intenta primero el camino HTTP (API de MediaWiki, sin navegador) y usa
+    Selenium headless solo si ese camino falla.
+    """
+
+    def __init__(self, pool: WebDriverPool = None):
+        self.pool = pool or get_driver_pool()
 
     def search_and_extract(self, search_term: str) -> dict:
         """
@@ -46,12 +104,30 @@ class WikipediaScraper:
             search_term: Termino a buscar
 
         Returns:
-            dict con url, text (primer parrafo), title
+            dict con url, text (primer parrafo), title y source ("http" o "selenium")
 
         Raises:
-            Exception si no se encuentra el articulo o hay error
+            ArticleNotFoundError si el articulo no existe
+            WebDriverPoolTimeout si no hay un navegador libre a tiempo
+            Exception si hay otro error
         """
-        driver = self._create_driver()
+        if settings.WIKIPEDIA_FAST_PATH:
+            try:
+                return wikipedia_http.fetch_article(search_term)
+            except ArticleNotFoundError:
+                raise
+            except Exception as e:
+                print(f"[WIKIPEDIA] Fallo la extraccion HTTP de '{search_term}', usando Selenium: {e}")
+
+        with self.pool.driver() as driver, observe_upstream("selenium"):
+            return self._extract(driver, search_term)
+
+    @staticmethod
+    def _extract(driver, search_term: str) -> dict:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
         try:
             # Codificar el termino para URL
@@ -70,7 +146,7 @@ class WikipediaScraper:
 
             # Detectar si fuimos redirigidos a busqueda
             if "search" in current_url.lower() or "Especial:Buscar" in current_url:
-                raise Exception(f"No se encontro articulo para: {search_term}")
+                raise ArticleNotFoundError(search_term)
 
             # Extraer el titulo de la pagina
             title = driver.title.replace(" - Wikipedia, la enciclopedia libre", "").strip()
@@ -81,34 +157,18 @@ class WikipediaScraper:
                 "#mw-content-text .mw-parser-output > p"
             )
 
-            first_paragraph = ""
-            for p in paragraphs:
-                text = p.text.strip()
-                # Ignorar parrafos vacios o muy cortos (coordenadas, etc.)
-                if text and len(text) > 50 and not text.startswith("Coordenadas"):
-                    first_paragraph = text
-                    break
-
-            if not first_paragraph:
-                # Intentar obtener cualquier parrafo con contenido
-                for p in paragraphs:
-                    text = p.text.strip()
-                    if text and len(text) > 20:
-                        first_paragraph = text
-                        break
-
+            first_paragraph = select_first_paragraph([p.text for p in paragraphs])
             if not first_paragraph:
                 raise Exception(f"No se pudo extraer contenido del articulo: {search_term}")
 
             return {
                 "url": current_url,
                 "text": first_paragraph,
-                "title": title
+                "title": title,
+                "source": "selenium"
             }
 
         except TimeoutException:
             raise Exception(f"Timeout al cargar Wikipedia para: {search_term}")
         except NoSuchElementException as e:
             raise Exception(f"No se encontro el elemento esperado: {str(e)}")
-        finally:
-            driver.quit()
@@ -0,0 +1,91 @@
+"""
+Registro de queries lentas via eventos de SQLAlchemy.
+
+- Cada query del engine se cronometra (before/after_cursor_execute); las que
+  superan SLOW_QUERY_THRESHOLD_MS se loguean como WARNING con el SQL, los
+  parametros, la duracion y la ruta de la request en curso
+- Con SLOW_QUERY_EXPLAIN=true se agrega el plan de `EXPLAIN (ANALYZE, BUFFERS)`
+  (solo SELECT: ANALYZE vuelve a ejecutar la query) dentro de un SAVEPOINT,
+  para que un error del EXPLAIN no aborte la transaccion de la request
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Scope ASGI de la request en curso (lo fija ProfilingMiddleware). Se guarda
+# el scope y no la ruta porque el router la resuelve despues del middleware
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+_MAX_PARAMS_CHARS = 2000
+
+
+def current_route() -> Optional[str]:
+    """Plantilla de la ruta en curso (p. ej. /api/transactions/{transaction_id}), o None fuera de una request."""
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return getattr(route, "path", scope.get("path"))
+
+
+def _explain(cursor, statement: str, parameters) -> Optional[str]:
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            explain_cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        except Exception:
+            explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+    except Exception as e:
+        return f"EXPLAIN fallo: {e}"
+    finally:
+        explain_cursor.close()
+
+
+def install_slow_query_log(engine):
+    """Registra los eventos que cronometran y loguean las queries lentas del engine."""
+    if settings.SLOW_QUERY_THRESHOLD_MS <= 0:
+        return
+
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_timer(exception_context):
+        # Una query que falla no llega a after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        if elapsed < threshold:
+            return
+
+        entry = {
+            "duration_ms": round(elapsed * 1000, 1),
+            "route": current_route(),
+            "statement": statement,
+            "parameters": repr(parameters)[:_MAX_PARAMS_CHARS],
+        }
+        if settings.SLOW_QUERY_EXPLAIN and not executemany \
+                and statement.lstrip().upper().startswith("SELECT"):
+            entry["plan"] = _explain(cursor, statement, parameters)
+
+        logger.warning("Query lenta", extra=entry)
@@ -0,0 +1,120 @@
+"""
+Trazas OpenTelemetry de punta a punta: API -> Celery -> Redis -> WebSocket.
+
+El contexto de la traza (W3C traceparent) viaja en los headers de las
+tareas de Celery y en el payload de los eventos publicados en Redis, asi
+los spans de la API, el worker y el broadcast quedan en una misma traza.
+
+Exportadores (TRACING_EXPORTER):
+- none: sin SDK, los spans no se registran (costo casi nulo)
+- console: cada span como JSON en stdout
+- file: un span JSON por linea en TRACING_FILE_PATH
+
+El SDK solo se importa si hay un exportador configurado.
+"""
+import time
+from typing import Optional
+
+from opentelemetry import context, propagate, trace
+
+from app.config import settings
+
+
+# Header de la tarea con el momento de publicacion (espera en la cola)
+PUBLISHED_AT_HEADER = "published_at"
+
+
+def get_tracer():
+    return trace.get_tracer("legalario")
+
+
+def setup_tracing(service_name: str):
+    """Configura el TracerProvider del proceso segun TRACING_EXPORTER."""
+    if settings.TRACING_EXPORTER == "none":
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if settings.TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    elif settings.TRACING_EXPORTER == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(settings.TRACING_FILE_PATH, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    else:
+        raise ValueError(f"TRACING_EXPORTER no soportado: {settings.TRACING_EXPORTER}")
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    print(f"[TRACING] Exportando trazas de '{service_name}' ({settings.TRACING_EXPORTER})")
+
+
+def inject_context() -> dict:
+    """Contexto actual como dict serializable (traceparent), vacio si no hay traza."""
+    carrier = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+def extract_context(carrier: Optional[dict]):
+    return propagate.extract(carrier or {})
+
+
+class _RequestGetter:
+    """Lee los headers propagados desde el request de una tarea de Celery."""
+
+    def get(self, request, key: str):
+        value = getattr(request, key, None)
+        return [value] if value is not None else None
+
+    def keys(self, request):
+        return list((request.headers or {}).keys())
+
+
+def instrument_celery_tracing():
+    """
+    Propaga la traza por los headers de las tareas y abre un span por
+    ejecucion, con la espera en la cola del broker como atributo.
+    """
+    from celery import signals
+
+    running = {}
+
+    @signals.before_task_publish.connect(weak=False)
+    def _inject(headers=None, **kwargs):
+        if headers is not None:
+            propagate.inject(headers)
+            headers[PUBLISHED_AT_HEADER] = time.time()
+
+    @signals.task_prerun.connect(weak=False)
+    def _start_span(task_id=None, task=None, **kwargs):
+        parent = propagate.extract(task.request, getter=_RequestGetter())
+        span = get_tracer().start_span(f"celery.run {task.name}", context=parent, kind=trace.SpanKind.CONSUMER)
+        span.set_attribute("celery.task_id", task_id)
+        span.set_attribute("celery.retries", task.request.retries or 0)
+
+        published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+        if published_at:
+            span.set_attribute("celery.queue_wait_ms", round((time.time() - published_at) * 1000, 1))
+
+        token = context.attach(trace.set_span_in_context(span))
+        running[task_id] = (span, token)
+
+    @signals.task_postrun.connect(weak=False)
+    def _end_span(task_id=None, state=None, **kwargs):
+        span, token = running.pop(task_id, (None, None))
+        if span is None:
+            return
+        span.set_attribute("celery.state", state or "UNKNOWN")
+        if state == "FAILURE":
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.end()
+        context.detach(token)
+
+    @signals.worker_init.connect(weak=False)
+    def _setup_worker_tracing(**kwargs):
+        setup_tracing("legalario-worker")
@@ -0,0 +1,400 @@
+"""
+Generador de datos sinteticos a gran escala (transactions, assistant_logs,
+wikipedia_logs) para benchmarks y revisiones de EXPLAIN.
+
+Carga con COPY en bloques de --batch-rows filas, repartidos entre --workers
+procesos con su propia conexion. Los datos imitan produccion:
+
+- Usuarios con sesgo Zipf (--user-skew, 0 = uniforme): pocos usuarios
+  concentran la mayoria de las filas, como en el historial real
+- Mezcla de status configurable (--status-mix) y fraccion async
+  (--async-ratio, con enqueued_at/started_at y celery_task_id)
+- created_at repartido en los ultimos --days dias
+- Logs que reutilizan un conjunto de --distinct-texts textos (text_blobs
+  deduplicados)
+
+Para decenas de millones de filas usar --defer-indexes: borra los indices
+secundarios de las tablas cargadas, carga sin ellos y los recrea al final
+(mucho mas rapido que mantenerlos fila a fila). --skip-search-vector
+desactiva durante la carga el trigger de busqueda de assistant_logs (las
+filas sinteticas quedan sin search_vector).
+
+Uso (desde backend/, contra la base de DATABASE_URL):
+    python -m benchmarks.generate_data --transactions 1000000
+    python -m benchmarks.generate_data --transactions 50000000 --assistant-logs 2000000 \\
+        --wikipedia-logs 2000000 --workers 8 --defer-indexes --skip-search-vector
+"""
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import psycopg2
+
+from app.config import settings
+
+
+TIPOS = ("deposito", "retiro", "transferencia")
+MODELS = ("claude-3-haiku-20240307", "claude-sonnet-4-20250514")
+WORDS = (
+    "transaccion banco deposito retiro transferencia cuenta saldo usuario "
+    "historia ciudad gobierno empresa mercado proceso sistema articulo region "
+    "poblacion economia cultura ciencia tecnologia desarrollo informacion"
+).split()
+
+TRANSACTION_COLUMNS = (
+    "id", "idempotency_key", "user_id", "monto", "tipo", "status", "created_at", "updated_at",
+    "processed_at", "enqueued_at", "started_at", "celery_task_id", "error_message"
+)
+ASSISTANT_LOG_COLUMNS = (
+    "id", "user_id", "original_text_hash", "summary", "model_used", "tokens_input",
+    "tokens_output", "processing_time_ms", "created_at"
+)
+WIKIPEDIA_LOG_COLUMNS = (
+    "id", "user_id", "search_term", "wikipedia_url", "extracted_text_hash", "summary",
+    "model_used", "processing_time_ms", "created_at"
+)
+
+NULL = "\\N"
+
+# Estado compartido por los procesos del pool (ver _init_worker)
+_worker = {}
+
+
+def database_dsn(url: str) -> str:
+    """URL de SQLAlchemy -> DSN de libpq (sin el sufijo del driver)."""
+    return url.replace("postgresql+psycopg2://", "postgresql://", 1)
+
+
+def escape(value: str) -> str:
+    """Escapa un texto para COPY en formato text."""
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def zipf_cum_weights(count: int, skew: float) -> list:
+    return list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(count)))
+
+
+def build_text(rng: random.Random, paragraphs: int, words: int) -> str:
+    return "\n\n".join(
+        " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+        for _ in range(paragraphs)
+    )
+
+
+# --- Generacion de bloques (en los procesos del pool) ---
+
+def _init_worker(dsn: str, config: dict):
+    connection = psycopg2.connect(dsn)
+    with connection.cursor() as cursor:
+        # La carga es reproducible: no vale la pena esperar el fsync de cada bloque
+        cursor.execute("SET synchronous_commit = off")
+    connection.commit()
+    _worker["connection"] = connection
+    _worker["config"] = config
+
+
+def _uuid(rng: random.Random) -> str:
+    # PostgreSQL acepta el UUID como 32 digitos hex sin guiones (mas barato que uuid.UUID)
+    return "%032x" % rng.getrandbits(128)
+
+
+def _created_at(rng: random.Random, now: datetime, days: float) -> datetime:
+    return now - timedelta(seconds=rng.random() * days * 86400)
+
+
+def _transaction_rows(rng: random.Random, start: int, count: int, config: dict) -> str:
+    now = config["now"]
+    statuses = list(config["status_mix"])
+    status_weights = list(config["status_mix"].values())
+    users = rng.choices(range(config["users"]), cum_weights=config["user_weights"], k=count)
+    chosen_statuses = rng.choices(statuses, weights=status_weights, k=count)
+
+    lines = []
+    for offset in range(count):
+        index = start + offset
+        status = chosen_statuses[offset]
+        created_at = _created_at(rng, now, config["days"])
+        is_async = rng.random() < config["async_ratio"]
+
+        enqueued_at = started_at = celery_task_id = NULL
+        done_at = created_at + timedelta(milliseconds=rng.randint(5, 200))
+        if is_async:
+            enqueued = created_at + timedelta(milliseconds=rng.randint(1, 20))
+            started = enqueued + timedelta(milliseconds=rng.expovariate(1 / 150))
+            done_at = started + timedelta(seconds=rng.uniform(2, 5))
+            enqueued_at, started_at = enqueued.isoformat(), started.isoformat()
+            celery_task_id = _uuid(rng)
+            if status == "pendiente":
+                started_at = NULL
+                done_at = enqueued
+
+        lines.append("\t".join((
+            _uuid(rng),
+            f"{'async_' if is_async else ''}synth-{config['run_id']}-{index}",
+            f"user-{users[offset]:06d}",
+            f"{rng.lognormvariate(5, 1.2):.2f}",
+            rng.choice(TIPOS),
+            status,
+            created_at.isoformat(),
+            done_at.isoformat(),
+            done_at.isoformat() if status == "procesado" else NULL,
+            enqueued_at,
+            started_at,
+            celery_task_id,
+            "Error simulado en procesamiento del banco" if status == "fallido" else NULL,
+        )))
+    return "\n".join(lines) + "\n"
+
+
+def _assistant_log_rows(rng: random.Random, start: int, count: int, config: dict) -> str:
+    user_ids = config["user_ids"]
+    users = rng.choices(range(len(user_ids)), cum_weights=config["user_weights"], k=count)
+    hashes = rng.choices(config["text_hashes"], k=count)
+
+    lines = []
+    for offset in range(count):
+        tokens_input = rng.randint(200, 8000)
+        lines.append("\t".join((
+            _uuid(rng),
+            user_ids[users[offset]],
+            hashes[offset],
+            escape(build_text(rng, 1, rng.randint(20, 60))),
+            rng.choice(MODELS),
+            str(tokens_input),
+            str(rng.randint(50, 500)),
+            str(int(rng.lognormvariate(7, 0.5))),
+            _created_at(rng, config["now"], config["days"]).isoformat(),
+        )))
+    return "\n".join(lines) + "\n"
+
+
+def _wikipedia_log_rows(rng: random.Random, start: int, count: int, config: dict) -> str:
+    user_ids = config["user_ids"]
+    users = rng.choices(range(len(user_ids)), cum_weights=config["user_weights"], k=count)
+    hashes = rng.choices(config["text_hashes"], k=count)
+
+    lines = []
+    for offset in range(count):
+        term = " ".join(rng.choices(WORDS, k=rng.randint(1, 3))).capitalize()
+        lines.append("\t".join((
+            _uuid(rng),
+            user_ids[users[offset]],
+            term,
+            f"https://es.wikipedia.org/wiki/{term.replace(' ', '_')}",
+            hashes[offset],
+            escape(build_text(rng, 1, rng.randint(20, 60))),
+            rng.choice(MODELS),
+            str(int(rng.lognormvariate(7.5, 0.6))),
+            _created_at(rng, config["now"], config["days"]).isoformat(),
+        )))
+    return "\n".join(lines) + "\n"
+
+
+TABLES = {
+    "transactions": (TRANSACTION_COLUMNS, _transaction_rows),
+    "assistant_logs": (ASSISTANT_LOG_COLUMNS, _assistant_log_rows),
+    "wikipedia_logs": (WIKIPEDIA_LOG_COLUMNS, _wikipedia_log_rows),
+}
+
+
+def _load_chunk(task: tuple) -> tuple:
+    table, start, count = task
+    columns, build_rows = TABLES[table]
+    config = _worker["config"]
+    # Semilla por bloque: el resultado no depende del orden ni de --workers
+    rng = random.Random(f"{config['seed']}:{table}:{start}")
+
+    data = io.StringIO(build_rows(rng, start, count, config))
+    connection = _worker["connection"]
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", data)
+    connection.commit()
+    return table, count
+
+
+# --- Preparacion y orquestacion (proceso principal) ---
+
+def create_users(connection, run_id: str, count: int, now: datetime) -> list:
+    from app.services.auth import get_password_hash
+
+    # Un solo hash bcrypt para todos: la carga no debe medir bcrypt
+    hashed_password = get_password_hash("password")
+    user_ids = [str(uuid.uuid4()) for _ in range(count)]
+    rows = "".join(
+        f"{user_id}\tsynth-{run_id}-{index}@example.com\t{hashed_password}\tUsuario sintetico {index}\tt\t{now.isoformat()}\n"
+        for index, user_id in enumerate(user_ids)
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            "COPY users (id, email, hashed_password, full_name, is_active, created_at) FROM STDIN",
+            io.StringIO(rows)
+        )
+    connection.commit()
+    return user_ids
+
+
+def create_text_blobs(connection, run_id: str, count: int, seed: int, now: datetime) -> list:
+    rng = random.Random(f"{seed}:text_blobs")
+    hashes = []
+    rows = io.StringIO()
+    for index in range(count):
+        # El run_id hace el contenido unico: COPY no admite ON CONFLICT
+        text = f"[{run_id}-{index}] " + build_text(rng, rng.randint(1, 6), rng.randint(40, 120))
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        hashes.append(digest)
+        rows.write(f"{digest}\t{escape(text)}\t{len(text.encode('utf-8'))}\t{now.isoformat()}\n")
+    rows.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert("COPY text_blobs (hash, content, size_bytes, created_at) FROM STDIN", rows)
+    connection.commit()
+    return hashes
+
+
+def secondary_indexes(connection, table: str) -> list:
+    """[(nombre, definicion)] de los indices que no respaldan PK/UNIQUE constraints."""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT index_class.relname, pg_get_indexdef(ix.indexrelid)
+            FROM pg_index ix
+            JOIN pg_class index_class ON index_class.oid = ix.indexrelid
+            JOIN pg_class table_class ON table_class.oid = ix.indrelid
+            LEFT JOIN pg_constraint c ON c.conindid = ix.indexrelid
+            WHERE table_class.relname = %s AND c.oid IS NULL
+        """, (table,))
+        return cursor.fetchall()
+
+
+def chunks(table: str, total: int, batch_rows: int) -> list:
+    return [(table, start, min(batch_rows, total - start)) for start in range(0, total, batch_rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--assistant-logs", type=int, default=0)
+    parser.add_argument("--wikipedia-logs", type=int, default=0)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--user-skew", type=float, default=1.1, help="Exponente Zipf (0 = uniforme)")
+    parser.add_argument("--status-mix", default="procesado=0.85,fallido=0.10,pendiente=0.05")
+    parser.add_argument("--async-ratio", type=float, default=0.7)
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument("--distinct-texts", type=int, default=20_000)
+    parser.add_argument("--batch-rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--defer-indexes", action="store_true")
+    parser.add_argument("--skip-search-vector", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    status_mix = parse_mix(args.status_mix)
+    unknown = set(status_mix) - {"procesado", "fallido", "pendiente"}
+    if unknown:
+        raise SystemExit(f"Status desconocidos en --status-mix: {', '.join(sorted(unknown))}")
+
+    dsn = database_dsn(args.database_url)
+    # Las claves unicas (idempotency_key, email, texto) llevan el run_id: se puede
+    # cargar varias veces sobre la misma base; --seed fija la forma de los datos
+    run_id = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+    start_time = time.perf_counter()
+
+    totals = {
+        "transactions": args.transactions,
+        "assistant_logs": args.assistant_logs,
+        "wikipedia_logs": args.wikipedia_logs,
+    }
+    tables = [table for table, total in totals.items() if total > 0]
+    has_logs = args.assistant_logs or args.wikipedia_logs
+
+    connection = psycopg2.connect(dsn)
+    user_ids, text_hashes = [], []
+    if has_logs:
+        user_ids = create_users(connection, run_id, args.users, now)
+        text_hashes = create_text_blobs(connection, run_id, args.distinct_texts, args.seed, now)
+
+    deferred = []
+    with connection.cursor() as cursor:
+        if args.defer_indexes:
+            for table in tables:
+                for name, definition in secondary_indexes(connection, table):
+                    deferred.append((name, definition))
+                    cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+        if args.skip_search_vector and args.assistant_logs:
+            cursor.execute("ALTER TABLE assistant_logs DISABLE TRIGGER assistant_logs_search_vector_trigger")
+    connection.commit()
+
+    config = {
+        "run_id": run_id,
+        "seed": args.seed,
+        "now": now,
+        "days": args.days,
+        "users": args.users,
+        "user_weights": zipf_cum_weights(args.users, args.user_skew),
+        "user_ids": user_ids,
+        "text_hashes": text_hashes,
+        "status_mix": status_mix,
+        "async_ratio": args.async_ratio,
+    }
+    tasks = [task for table in tables for task in chunks(table, totals[table], args.batch_rows)]
+
+    loaded = dict.fromkeys(tables, 0)
+    load_start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(dsn, config)) as pool:
+            for table, count in pool.imap_unordered(_load_chunk, tasks):
+                loaded[table] += count
+        load_seconds = time.perf_counter() - load_start
+    finally:
+        with connection.cursor() as cursor:
+            if args.skip_search_vector and args.assistant_logs:
+                cursor.execute("ALTER TABLE assistant_logs ENABLE TRIGGER assistant_logs_search_vector_trigger")
+            connection.commit()
+
+            # Recrear los indices aunque la carga haya fallado a medias
+            index_start = time.perf_counter()
+            cursor.execute("SET maintenance_work_mem = '1GB'")
+            for name, definition in deferred:
+                cursor.execute(definition)
+            connection.commit()
+            index_seconds = time.perf_counter() - index_start
+
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f"ANALYZE {table}")
+    connection.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(json.dumps({
+        "run_id": run_id,
+        "rows": loaded,
+        "users": len(user_ids),
+        "text_blobs": len(text_hashes),
+        "workers": args.workers,
+        "load_s": round(load_seconds, 1),
+        "rows_per_s": int(sum(loaded.values()) / load_seconds) if load_seconds else None,
+        "indexes_recreated": [name for name, _ in deferred],
+        "index_build_s": round(index_seconds, 1),
+        "elapsed_s": round(elapsed, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
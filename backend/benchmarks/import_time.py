@@ -0,0 +1,105 @@
+"""
+Benchmark: tiempo de importacion de la API (arranque en frio).
+
+Ejecuta `python -X importtime -c "import app.main"` en procesos nuevos,
+reporta el tiempo acumulado de app.main (p50/max) y los modulos de primer
+nivel mas caros, y verifica que las dependencias pesadas que se cargan
+bajo demanda (Selenium, SDK de Anthropic, passlib, Celery, httpx,
+selectolax) no se importen al arrancar.
+
+Sale con codigo 1 si se importa algun modulo prohibido o si el p50 supera
+--max-ms, para usarlo como chequeo en CI.
+
+Uso (desde backend/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 5 --max-ms 1500
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+TARGET = "app.main"
+
+# Se importan en el primer uso, nunca al iniciar la API
+LAZY_MODULES = ("selenium", "anthropic", "passlib", "celery", "httpx", "selectolax", "pyinstrument")
+
+
+def run_importtime(target: str) -> list:
+    """[(modulo, self_us, acumulado_us, nivel)] de una importacion en un proceso nuevo."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, raw_name = int(parts[0]), int(parts[1]), parts[2]
+        name = raw_name.strip()
+        level = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        entries.append((name, self_us, cumulative_us, level))
+    return entries
+
+
+def direct_imports(entries: list, target: str) -> list:
+    """
+    Entradas importadas directamente por `target`: importtime lista cada
+    modulo al terminar, asi que son las de nivel 1 entre `target` y la
+    entrada de nivel 0 anterior.
+    """
+    index = next(i for i, entry in enumerate(entries) if entry[0] == target)
+    children = []
+    for entry in reversed(entries[:index]):
+        if entry[3] == 0:
+            break
+        if entry[3] == 1:
+            children.append(entry)
+    return children
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None, help="Falla si el p50 supera este valor")
+    args = parser.parse_args()
+
+    totals = []
+    entries = []
+    for _ in range(args.runs):
+        entries = run_importtime(TARGET)
+        totals.append(next(cumulative for name, _, cumulative, _ in entries if name == TARGET) / 1000)
+
+    imported = {name for name, _, _, _ in entries}
+    # Paquetes raiz prohibidos que aparecieron en la importacion
+    lazy_violations = sorted({name.split(".")[0] for name in imported} & set(LAZY_MODULES))
+
+    top = sorted(direct_imports(entries, TARGET), key=lambda entry: entry[2], reverse=True)[:args.top]
+
+    p50 = statistics.median(totals)
+    report = {
+        "target": TARGET,
+        "runs": args.runs,
+        "p50_ms": round(p50, 1),
+        "max_ms": round(max(totals), 1),
+        "top_modules_ms": {name: round(cumulative / 1000, 1) for name, _, cumulative, _ in top},
+        "lazy_modules_imported": lazy_violations,
+        "budget_ms": args.max_ms,
+    }
+    print(json.dumps(report, indent=2))
+
+    if lazy_violations:
+        print(f"Modulos que deberian cargarse bajo demanda: {', '.join(lazy_violations)}", file=sys.stderr)
+        sys.exit(1)
+    if args.max_ms is not None and p50 > args.max_ms:
+        print(f"Importar {TARGET} tarda {p50:.1f} ms (limite {args.max_ms} ms)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
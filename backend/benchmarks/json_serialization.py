@@ -0,0 +1,120 @@
+"""
+Benchmark: serializacion del listado de transacciones.
+
+Compara el camino anterior (entidades ORM validadas contra
+List[TransactionResponse] por FastAPI y codificadas con JSONResponse)
+contra el camino rapido (tuplas de columnas codificadas con orjson via
+rows_response). Sin base de datos: las filas se construyen en memoria.
+
+Uso (desde backend/):
+    python -m benchmarks.json_serialization
+    python -m benchmarks.json_serialization --rows 100 1000 5000 --iterations 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.fast_json import rows_response
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionResponse
+
+
+# Los campos opcionales que build_rows no llena quedan en None: un campo nuevo
+# del schema no rompe el benchmark
+TransactionRow = namedtuple(
+    "TransactionRow",
+    list(TransactionResponse.model_fields),
+    defaults=[None] * len(TransactionResponse.model_fields)
+)
+
+
+def build_rows(count: int) -> list:
+    now = datetime.utcnow()
+    rows = []
+    for index in range(count):
+        created_at = now - timedelta(seconds=index)
+        rows.append(TransactionRow(
+            id=uuid.uuid4(),
+            idempotency_key=uuid.uuid4().hex,
+            user_id=f"user-{index % 50}",
+            monto=round(10 + index * 1.37, 2),
+            tipo=("deposito", "retiro", "transferencia")[index % 3],
+            status=("pendiente", "procesado", "fallido")[index % 3],
+            created_at=created_at,
+            updated_at=created_at + timedelta(seconds=3),
+            processed_at=created_at + timedelta(seconds=3) if index % 3 == 1 else None,
+            enqueued_at=created_at if index % 2 else None,
+            started_at=created_at + timedelta(seconds=1) if index % 2 and index % 3 else None,
+            celery_task_id=str(uuid.uuid4()) if index % 2 else None,
+            error_message="Fondos insuficientes" if index % 3 == 2 else None
+        ))
+    return rows
+
+
+def orm_entities(rows: list) -> list:
+    return [Transaction(**row._asdict()) for row in rows]
+
+
+def old_path(field, entities: list) -> bytes:
+    content = asyncio.run(serialize_response(field=field, response_content=entities, is_coroutine=False))
+    return JSONResponse(content).body
+
+
+def new_path(rows: list) -> bytes:
+    return rows_response(rows).body
+
+
+def measure(fn, iterations: int) -> dict:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    field = create_response_field("Response_list_transactions", List[TransactionResponse])
+
+    results = []
+    for count in args.rows:
+        rows = build_rows(count)
+        entities = orm_entities(rows)
+
+        # Ambos caminos deben producir el mismo JSON
+        if json.loads(old_path(field, entities)) != json.loads(new_path(rows)):
+            raise SystemExit(f"Las salidas no coinciden para {count} filas")
+
+        old = measure(lambda: old_path(field, entities), args.iterations)
+        new = measure(lambda: new_path(rows), args.iterations)
+        results.append({
+            "rows": count,
+            "orm_validate_json": old,
+            "rows_orjson": new,
+            "speedup_p50": round(old["p50_ms"] / new["p50_ms"], 1)
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Prueba de carga de los endpoints principales contra una API en ejecucion.
+
+Escenarios (--scenarios):
+- create: POST /api/transactions/create
+- async: POST /api/transactions/async-process (latencia de encolado)
+- list: GET /api/transactions/ paginando con skip/limit
+- stream: abre --ws-connections WebSockets en /api/transactions/stream,
+  encola --stream-events transacciones async y mide cuanto tarda cada
+  STATUS_CHANGE en llegar a cada socket (API -> Celery -> Redis -> broadcast);
+  antes espera a que no queden transacciones pendientes de escenarios previos
+
+Reporta p50/p95/p99, requests (o entregas) por segundo y errores como JSON,
+para comparar entre versiones (--output guarda el reporte).
+
+Sin llamadas reales a Claude ni demoras del banco: levantar la API y los
+workers con el modelo y el banco simulados, p. ej.
+
+    CLAUDE_BACKEND=fake BANK_LATENCY_MIN_SECONDS=0 BANK_LATENCY_MAX_SECONDS=0 docker-compose up --build
+
+o apuntar --base-url a una API local con Postgres y Redis propios.
+
+Uso (desde backend/):
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --requests 2000 --concurrency 50 --output bench.json
+    python -m benchmarks.load_test --scenarios stream --ws-connections 500 --stream-events 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import websockets
+
+
+SCENARIOS = ("create", "async", "list", "stream")
+TIPOS = ("deposito", "retiro", "transferencia")
+
+
+def summarize(timings: list, elapsed: float, errors: int, unit: str = "requests") -> dict:
+    """Percentiles (ms) y throughput de una lista de latencias en segundos."""
+    ordered = sorted(timings)
+
+    def percentile(p: float) -> float:
+        if not ordered:
+            return None
+        return round(ordered[min(int(len(ordered) * p), len(ordered) - 1)] * 1000, 2)
+
+    return {
+        unit: len(ordered),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        f"{unit}_per_s": round(len(ordered) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else None,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def transaction_payload(run_id: str, index: int) -> dict:
+    # user_id unico por request: la clave de idempotencia depende de user_id/monto/tipo
+    return {
+        "user_id": f"bench-{run_id}-{index}",
+        "monto": round(random.uniform(1, 5000), 2),
+        "tipo": random.choice(TIPOS),
+    }
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_requests(total: int, concurrency: int, make_request) -> dict:
+    """Ejecuta `total` llamadas a make_request(i) con `concurrency` en vuelo."""
+    timings = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(index)
+                ok = response.is_success
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                timings.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(timings, time.perf_counter() - start, errors)
+
+
+async def scenario_create(client, args, run_id):
+    return await run_requests(
+        args.requests, args.concurrency,
+        lambda i: client.post("/api/transactions/create", json=transaction_payload(run_id, i))
+    )
+
+
+async def scenario_async(client, args, run_id):
+    return await run_requests(
+        args.requests, args.concurrency,
+        lambda i: client.post("/api/transactions/async-process", json=transaction_payload(f"{run_id}a", i))
+    )
+
+
+async def scenario_list(client, args, run_id):
+    return await run_requests(
+        args.requests, args.concurrency,
+        lambda i: client.get("/api/transactions/", params={
+            "skip": (i % args.pages) * args.page_size,
+            "limit": args.page_size
+        })
+    )
+
+
+async def wait_for_drain(client, timeout: float) -> float:
+    """
+    Espera a que no queden transacciones pendientes (cola de Celery vacia),
+    p. ej. las 500 del escenario async. Retorna los segundos esperados.
+    """
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        response = await client.get("/api/transactions/", params={"tx_status": "pendiente", "limit": 1})
+        if response.is_success and not response.json():
+            break
+        await asyncio.sleep(0.5)
+    return round(time.perf_counter() - start, 2)
+
+
+async def scenario_stream(client, args, run_id):
+    ws_url = args.base_url.replace("http", "ws", 1).rstrip("/") + "/api/transactions/stream"
+    # Sin esto las entregas medidas incluirian el backlog de escenarios anteriores
+    drain_wait = await wait_for_drain(client, args.drain_timeout)
+
+    posted = {}
+    # Un STATUS_CHANGE puede llegar antes que la respuesta del POST: se guardan
+    # los tiempos de llegada por id y se cruzan con los de envio al final
+    received = {}
+    # Solo cuentan las entregas de transacciones de este escenario
+    matched = 0
+    expected = args.ws_connections * args.stream_events
+    done = asyncio.Event()
+
+    def count(deliveries: int):
+        nonlocal matched
+        matched += deliveries
+        if matched >= expected:
+            done.set()
+
+    async def listen(socket):
+        async for raw in socket:
+            message = json.loads(raw)
+            if message.get("type") != "STATUS_CHANGE":
+                continue
+            transaction_id = message.get("data", {}).get("id")
+            received.setdefault(transaction_id, []).append(time.perf_counter())
+            if transaction_id in posted:
+                count(1)
+
+    sockets = [await websockets.connect(ws_url, max_queue=None) for _ in range(args.ws_connections)]
+    listeners = [asyncio.create_task(listen(socket)) for socket in sockets]
+
+    async def enqueue(index: int):
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/transactions/async-process",
+            json=transaction_payload(f"{run_id}s", index)
+        )
+        if response.is_success:
+            transaction_id = response.json()["transaction_id"]
+            posted[transaction_id] = start
+            # Entregas que llegaron antes que la respuesta del POST
+            count(len(received.get(transaction_id, [])))
+        return response
+
+    start = time.perf_counter()
+    enqueue_stats = await run_requests(args.stream_events, args.concurrency, enqueue)
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.stream_timeout)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - start
+
+    for task in listeners:
+        task.cancel()
+    await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+
+    deliveries = [
+        arrived - sent_at
+        for transaction_id, sent_at in posted.items()
+        for arrived in received.get(transaction_id, [])
+    ]
+    delivery_stats = summarize(deliveries, elapsed, expected - len(deliveries), unit="deliveries")
+    return {
+        "drain_wait_s": drain_wait,
+        "ws_connections": args.ws_connections,
+        "events": args.stream_events,
+        "enqueue": enqueue_stats,
+        # Desde el POST hasta que cada socket recibe el STATUS_CHANGE
+        "delivery": delivery_stats,
+    }
+
+
+async def run(args) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        results = {}
+        for name in args.scenarios:
+            handler = globals()[f"scenario_{name}"]
+            results[name] = await handler(client, args, run_id)
+
+    return {
+        "started_at": started_at,
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="user")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Requests por escenario (create, async, list)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=10, help="Paginas distintas que recorre el escenario list")
+    parser.add_argument("--ws-connections", type=int, default=100)
+    parser.add_argument("--stream-events", type=int, default=20)
+    parser.add_argument("--stream-timeout", type=float, default=60, help="Espera maxima de las entregas (s)")
+    parser.add_argument("--drain-timeout", type=float, default=120,
+                        help="Espera maxima a que se vacie la cola antes del escenario stream (s)")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout por request HTTP (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Ademas de imprimirlo, guardar el reporte JSON en este archivo")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    report = asyncio.run(run(args))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
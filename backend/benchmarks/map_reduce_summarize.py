@@ -0,0 +1,102 @@
+"""
+Benchmark: resumen en una sola llamada vs map-reduce para textos largos.
+
+Usa un modelo simulado (sin llamadas reales a Claude) cuya latencia crece
+con el tamano de la entrada (prefill) y con los tokens generados.
+
+Uso (desde backend/):
+    python -m benchmarks.map_reduce_summarize
+    python -m benchmarks.map_reduce_summarize --sizes 20000 50000 --concurrency 4
+"""
+import argparse
+import json
+import time
+
+from app.config import settings
+from app.services.claude_client import ClaudeClient
+
+
+class StubClaudeClient(ClaudeClient):
+    """ClaudeClient con latencia simulada y sin red."""
+
+    def __init__(self, base_s: float, prefill_s_per_char: float, decode_s_per_token: float):
+        self.default_model = "stub-model"
+        self.base_s = base_s
+        self.prefill_s_per_char = prefill_s_per_char
+        self.decode_s_per_token = decode_s_per_token
+
+    def summarize(self, text: str, max_tokens: int = 500) -> dict:
+        tokens_input = len(text) // 4
+        tokens_output = min(max_tokens, max(20, len(text) // 40))
+        time.sleep(
+            self.base_s
+            + len(text) * self.prefill_s_per_char
+            + tokens_output * self.decode_s_per_token
+        )
+        return {
+            "summary": ("resumen " * (tokens_output // 2)).strip(),
+            "model": self.default_model,
+            "tokens_input": tokens_input,
+            "tokens_output": tokens_output
+        }
+
+
+def build_text(size: int) -> str:
+    """Genera un documento sintetico de `size` caracteres con parrafos."""
+    paragraph = ("La transaccion fue procesada por el banco externo y registrada "
+                 "en el sistema con su clave de idempotencia correspondiente. ") * 6
+    paragraphs = []
+    total = 0
+    while total < size:
+        paragraphs.append(paragraph.strip())
+        total += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 25000, 50000])
+    parser.add_argument("--max-tokens", type=int, default=500)
+    parser.add_argument("--chunk-chars", type=int, default=settings.SUMMARIZE_CHUNK_CHARS)
+    parser.add_argument("--concurrency", type=int, default=settings.SUMMARIZE_MAX_CONCURRENCY)
+    parser.add_argument("--base-ms", type=float, default=150, help="Latencia fija por llamada")
+    parser.add_argument("--prefill-us-per-char", type=float, default=40, help="Latencia por caracter de entrada")
+    parser.add_argument("--decode-ms-per-token", type=float, default=5, help="Latencia por token generado")
+    args = parser.parse_args()
+
+    client = StubClaudeClient(
+        base_s=args.base_ms / 1000,
+        prefill_s_per_char=args.prefill_us_per_char / 1_000_000,
+        decode_s_per_token=args.decode_ms_per_token / 1000
+    )
+
+    results = []
+    for size in args.sizes:
+        text = build_text(size)
+
+        start = time.perf_counter()
+        client.summarize(text=text, max_tokens=args.max_tokens)
+        single_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        result = client.summarize_map_reduce(
+            text=text,
+            max_tokens=args.max_tokens,
+            chunk_chars=args.chunk_chars,
+            max_concurrency=args.concurrency
+        )
+        map_reduce_ms = (time.perf_counter() - start) * 1000
+
+        results.append({
+            "chars": size,
+            "single_ms": round(single_ms, 1),
+            "map_reduce_ms": round(map_reduce_ms, 1),
+            "speedup": round(single_ms / map_reduce_ms, 2),
+            "stages": result.get("stages")
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: fan-out de WebSocket con el logging anterior vs el actual.
+
+Compara el broadcast con el `log()` anterior (print + flush a stdout por
+cada envio, send_json por conexion) contra ConnectionManager.broadcast
+con logging estructurado (QueueHandler + muestreo) y el mensaje
+serializado una sola vez. Las conexiones son falsas: send_json serializa
+y codifica como Starlette, sin red. stdout se redirige a un
+archivo temporal para que el costo de escribir sea real pero no ensucie
+la salida.
+
+Uso (desde backend/):
+    python -m benchmarks.websocket_fanout
+    python -m benchmarks.websocket_fanout --connections 100 1000 5000 --events 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+from app.api.websocket import ConnectionManager
+from app.logging_config import setup_logging
+
+
+EVENT = {
+    "type": "STATUS_CHANGE",
+    "data": {
+        "id": "6f1c1a52-3b36-4c5a-9a51-0c2f5d1e8a77",
+        "user_id": "user-1",
+        "status": "procesado",
+        "monto": 1250.5,
+        "tipo": "deposito",
+        "updated_at": "2026-10-19T12:00:00",
+        "processed_at": "2026-10-19T12:00:00",
+        "error_message": None
+    }
+}
+
+
+class FakeWebSocket:
+    # Como Starlette: send_json serializa y envia texto
+    async def send_json(self, data: dict):
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def send_text(self, data: str):
+        data.encode("utf-8")
+
+
+def legacy_log(msg):
+    print(msg, flush=True)
+    sys.stdout.flush()
+
+
+async def legacy_broadcast(connections: list, message: dict):
+    """broadcast() antes del cambio, con un log por envio."""
+    legacy_log(f"[WS] Broadcasting a {len(connections)} conexiones")
+    for connection in connections:
+        try:
+            await connection.send_json(message)
+            legacy_log(f"[WS] Mensaje enviado: {message.get('type')}")
+        except Exception as e:
+            legacy_log(f"[WS] Error enviando: {e}")
+
+
+def measure(broadcast, events: int) -> dict:
+    async def run():
+        timings = []
+        for _ in range(events):
+            start = time.perf_counter()
+            await broadcast()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    timings = sorted(asyncio.run(run()))
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--events", type=int, default=30)
+    args = parser.parse_args()
+
+    results = []
+    real_stdout = sys.stdout
+    with tempfile.TemporaryFile("w") as sink:
+        sys.stdout = sink
+        setup_logging(stream=sink)
+        try:
+            for count in args.connections:
+                connections = [FakeWebSocket() for _ in range(count)]
+                manager = ConnectionManager()
+                manager.active_connections = list(connections)
+
+                before = measure(lambda: legacy_broadcast(connections, EVENT), args.events)
+                after = measure(lambda: manager.broadcast(EVENT), args.events)
+                results.append({
+                    "connections": count,
+                    "print_flush": before,
+                    "structured_sampled": after,
+                    "messages_per_s_before": int(count / (before["p50_ms"] / 1000)),
+                    "messages_per_s_after": int(count / (after["p50_ms"] / 1000)),
+                    "speedup_p50": round(before["p50_ms"] / after["p50_ms"], 1)
+                })
+        finally:
+            sys.stdout = real_stdout
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
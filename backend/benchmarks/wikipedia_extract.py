@@ -0,0 +1,113 @@
+"""
+Benchmark: extraccion de Wikipedia por HTTP (parseo con selectolax).
+
+Sin red: parsea las respuestas de action=parse guardadas en
+benchmarks/fixtures/wikipedia/, verifica el resultado contra expected.json
+y mide el tiempo de parseo. Con --live ademas compara, para terminos reales,
+el camino HTTP contra Selenium (requiere red y Chromium).
+
+Uso (desde backend/):
+    python -m benchmarks.wikipedia_extract
+    python -m benchmarks.wikipedia_extract --iterations 2000
+    python -m benchmarks.wikipedia_extract --live Python Madrid
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from app.services import wikipedia_http
+from app.services.wikipedia_http import ArticleNotFoundError
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "wikipedia"
+
+
+def check_fixture(name: str, expected: dict) -> dict:
+    """Parsea una fixture y la compara con lo esperado."""
+    data = json.loads((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+
+    try:
+        result = wikipedia_http.parse_response(data, expected["search_term"])
+    except ArticleNotFoundError:
+        return {"ok": bool(expected.get("not_found")), "data": data}
+
+    ok = (
+        not expected.get("not_found")
+        and result["title"] == expected["title"]
+        and result["url"] == expected["url"]
+        and result["revision"] == expected["revision"]
+        and result["text"].startswith(expected["text_startswith"])
+    )
+    return {"ok": ok, "data": data, "result": result}
+
+
+def time_parse(data: dict, search_term: str, iterations: int) -> dict:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            wikipedia_http.parse_response(data, search_term)
+        except ArticleNotFoundError:
+            pass
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(timings[int(len(timings) * 0.99) - 1], 3),
+    }
+
+
+def time_live(terms: list) -> list:
+    from app.services.wikipedia_scraper import WikipediaScraper, get_driver_pool
+
+    scraper = WikipediaScraper()
+    results = []
+    for term in terms:
+        start = time.perf_counter()
+        wikipedia_http.fetch_article(term)
+        http_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with scraper.pool.driver() as driver:
+            scraper._extract(driver, term)
+        selenium_ms = (time.perf_counter() - start) * 1000
+
+        results.append({"term": term, "http_ms": round(http_ms, 1), "selenium_ms": round(selenium_ms, 1)})
+
+    get_driver_pool().close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--live", nargs="*", default=[], metavar="TERM", help="Terminos a buscar en linea")
+    args = parser.parse_args()
+
+    expected = json.loads((FIXTURES_DIR / "expected.json").read_text(encoding="utf-8"))
+
+    fixtures = []
+    for name, fixture_expected in expected.items():
+        checked = check_fixture(name, fixture_expected)
+        fixtures.append({
+            "fixture": name,
+            "ok": checked["ok"],
+            "bytes": len(checked["data"].get("parse", {}).get("text", "").encode("utf-8")),
+            **time_parse(checked["data"], fixture_expected["search_term"], args.iterations)
+        })
+
+    output = {"fixtures": fixtures}
+    if args.live:
+        output["live"] = time_live(args.live)
+
+    print(json.dumps(output, indent=2))
+
+    if not all(item["ok"] for item in fixtures):
+        raise SystemExit("Alguna fixture no coincide con expected.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+ETag del listado de transacciones: una fila que sale del filtro invalida el 304.
+
+Corre contra SQLite en memoria con las dependencias de sesion y usuario reemplazadas.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.api.dependencies import get_current_user, get_read_db
+from app.models.transaction import Transaction
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # DDL a mano: los tipos UUID/ENUM de Postgres no compilan en SQLite
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE transactions (
+                id CHAR(32) PRIMARY KEY, idempotency_key VARCHAR(255) UNIQUE NOT NULL,
+                user_id VARCHAR(255) NOT NULL, monto FLOAT NOT NULL, tipo VARCHAR(20) NOT NULL,
+                status VARCHAR(20) NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+                processed_at DATETIME, enqueued_at DATETIME, started_at DATETIME,
+                celery_task_id VARCHAR(255), error_message VARCHAR(500)
+            )
+        """))
+    session = sessionmaker(bind=engine)()
+
+    app.dependency_overrides[get_read_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: object()
+    yield session
+    app.dependency_overrides.clear()
+    session.close()
+
+
+def _transaction(key: str, status: str, updated_at: datetime) -> Transaction:
+    return Transaction(
+        idempotency_key=key, user_id="user-1", monto=10, tipo="deposito",
+        status=status, created_at=updated_at, updated_at=updated_at
+    )
+
+
+def test_row_leaving_filtered_set_changes_etag(db):
+    now = datetime.utcnow()
+    newest = _transaction("a", "pendiente", now)
+    leaving = _transaction("b", "pendiente", now - timedelta(minutes=5))
+    db.add_all([newest, leaving])
+    db.commit()
+
+    client = TestClient(app)
+    first = client.get("/api/transactions/", params={"tx_status": "pendiente"})
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+
+    # Sale del filtro una fila que no tenia el max(updated_at)
+    leaving.status = "procesado"
+    leaving.updated_at = now - timedelta(minutes=1)
+    db.commit()
+
+    second = client.get(
+        "/api/transactions/",
+        params={"tx_status": "pendiente"},
+        headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert second.status_code == 200
+    assert [row["id"] for row in second.json()] == [str(newest.id)]
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_unchanged_list_returns_304(db):
+    db.add(_transaction("a", "pendiente", datetime.utcnow()))
+    db.commit()
+
+    client = TestClient(app)
+    first = client.get("/api/transactions/")
+    second = client.get("/api/transactions/", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
@@ -6,9 +6,11 @@ export default function AssistantSummary({ onSuccess, onError }) {
   const [text, setText] = useState('')
   const [summary, setSummary] = useState(null)
   const [loading, setLoading] = useState(false)
+  const [streaming, setStreaming] = useState(false)
   const [history, setHistory] = useState([])
   const [loadingHistory, setLoadingHistory] = useState(true)
   const [expandedItems, setExpandedItems] = useState({})
+  const [details, setDetails] = useState({})
 
   // Cargar historial al montar
   useEffect(() => {
@@ -35,10 +37,16 @@ export default function AssistantSummary({ onSuccess, onError }) {
     }
 
     setLoading(true)
+    setStreaming(false)
     setSummary(null)
 
     try {
-      const result = await api.summarizeText({ text, max_tokens: 500 })
+      let partial = ''
+      const result = await api.summarizeTextStream({ text, max_tokens: 500 }, (chunk) => {
+        partial += chunk
+        setStreaming(true)
+        setSummary({ summary: partial })
+      })
       setSummary(result)
       onSuccess({ message: 'Resumen generado exitosamente' })
       // Recargar historial
@@ -47,20 +55,32 @@ export default function AssistantSummary({ onSuccess, onError }) {
       onError(err)
     } finally {
       setLoading(false)
+      setStreaming(false)
     }
   }
 
-  const toggleExpand = (id) => {
+  const toggleExpand = async (id) => {
+    const expanding = !expandedItems[id]
     setExpandedItems(prev => ({
       ...prev,
       [id]: !prev[id]
     }))
+
+    // El historial solo trae un preview; el texto completo se pide al expandir
+    if (expanding && !details[id]) {
+      try {
+        const detail = await api.getSummaryDetail(id)
+        setDetails(prev => ({ ...prev, [id]: detail }))
+      } catch (err) {
+        onError(err)
+      }
+    }
   }
 
   return (
     <div style={styles.container}>
       {/* Loading Overlay */}
-      {loading && <LoadingOverlay message="Generando resumen con IA..." />}
+      {loading && !streaming && <LoadingOverlay message="Generando resumen con IA..." />}
 
       {/* Seccion principal - Formulario y Resultado */}
       <div style={styles.mainSection}>
@@ -97,11 +117,13 @@ export default function AssistantSummary({ onSuccess, onError }) {
           <div style={styles.resultContainer}>
             <h3 style={styles.resultTitle}>Resumen Generado</h3>
             <p style={styles.resultText}>{summary.summary}</p>
-            <div style={styles.meta}>
-              <span style={styles.metaItem}>Modelo: {summary.model_used}</span>
-              <span style={styles.metaItem}>Tokens: {summary.tokens_input} entrada / {summary.tokens_output} salida</span>
-              <span style={styles.metaItem}>Tiempo: {summary.processing_time_ms}ms</span>
-            </div>
+            {summary.id && (
+              <div style={styles.meta}>
+                <span style={styles.metaItem}>Modelo: {summary.model_used}</span>
+                <span style={styles.metaItem}>Tokens: {summary.tokens_input} entrada / {summary.tokens_output} salida</span>
+                <span style={styles.metaItem}>Tiempo: {summary.processing_time_ms}ms</span>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -135,7 +157,7 @@ export default function AssistantSummary({ onSuccess, onError }) {
                   {isExpanded ? (
                     <>
                       <div style={styles.historyLabel}>Texto Original:</div>
-                      <div style={styles.historyOriginal}>{item.original_text}</div>
+                      <div style={styles.historyOriginal}>{details[item.id]?.original_text ?? item.original_text_preview}</div>
                       <div style={styles.historyLabel}>Resumen:</div>
                       <div style={styles.historySummaryFull}>{item.summary}</div>
                     </>
@@ -9,6 +9,7 @@ export default function WikipediaSearch({ onSuccess, onError }) {
   const [history, setHistory] = useState([])
   const [loadingHistory, setLoadingHistory] = useState(true)
   const [expandedItems, setExpandedItems] = useState({})
+  const [details, setDetails] = useState({})
 
   // Cargar historial al montar
   useEffect(() => {
@@ -51,11 +52,22 @@ export default function WikipediaSearch({ onSuccess, onError }) {
     }
   }
 
-  const toggleExpand = (id) => {
+  const toggleExpand = async (id) => {
+    const expanding = !expandedItems[id]
     setExpandedItems(prev => ({
       ...prev,
       [id]: !prev[id]
     }))
+
+    // El historial solo trae un preview; el texto completo se pide al expandir
+    if (expanding && !details[id]) {
+      try {
+        const detail = await api.getWikipediaDetail(id)
+        setDetails(prev => ({ ...prev, [id]: detail }))
+      } catch (err) {
+        onError(err)
+      }
+    }
   }
 
   return (
@@ -163,7 +175,7 @@ export default function WikipediaSearch({ onSuccess, onError }) {
                         </a>
                       </div>
                       <div style={styles.historyLabel}>Texto Extraido:</div>
-                      <div style={styles.historyExtracted}>{item.extracted_text}</div>
+                      <div style={styles.historyExtracted}>{details[item.id]?.extracted_text ?? item.extracted_text_preview}</div>
                       <div style={styles.historyLabel}>Resumen:</div>
                       <div style={styles.historySummaryFull}>{item.summary}</div>
                     </>
@@ -173,6 +173,56 @@ export const api = {
     return result
   },
 
+  /**
+   * Generar resumen con IA en streaming (NDJSON)
+   * Llama onDelta(texto) por cada fragmento y retorna el registro final.
+   */
+  async summarizeTextStream(data, onDelta) {
+    let response = await fetch(`${API_BASE}/assistant/summarize/stream`, {
+      method: 'POST',
+      headers: getAuthHeaders(),
+      body: JSON.stringify(data)
+    })
+    response = await handleResponse(response)
+
+    if (!response.ok) {
+      const result = await response.json()
+      throw new Error(result.detail?.message || result.detail || 'Error al generar resumen')
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let final = null
+
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+
+      buffer += decoder.decode(value, { stream: true })
+      const lines = buffer.split('\n')
+      buffer = lines.pop()
+
+      for (const line of lines) {
+        if (!line.trim()) continue
+        const event = JSON.parse(line)
+        if (event.type === 'delta') {
+          onDelta(event.text)
+        } else if (event.type === 'done') {
+          final = event.data
+        } else if (event.type === 'error') {
+          throw new Error(event.message || 'Error al generar resumen')
+        }
+      }
+    }
+
+    if (!final) {
+      throw new Error('El stream termino sin resumen')
+    }
+
+    return final
+  },
+
   /**
    * Obtener historial de resumenes
    */
@@ -189,6 +239,22 @@ export const api = {
     return response.json()
   },
 
+  /**
+   * Obtener un resumen del historial con el texto original completo
+   */
+  async getSummaryDetail(id) {
+    let response = await fetch(`${API_BASE}/assistant/history/${id}`, {
+      headers: getAuthHeaders()
+    })
+    response = await handleResponse(response)
+
+    if (!response.ok) {
+      throw new Error('Error al obtener detalle del resumen')
+    }
+
+    return response.json()
+  },
+
   /**
    * Buscar en Wikipedia y generar resumen con IA
    */
@@ -222,6 +288,22 @@ export const api = {
       throw new Error('Error al obtener historial de Wikipedia')
     }
 
+    return response.json()
+  },
+
+  /**
+   * Obtener una busqueda del historial con el texto extraido completo
+   */
+  async getWikipediaDetail(id) {
+    let response = await fetch(`${API_BASE}/wikipedia/history/${id}`, {
+      headers: getAuthHeaders()
+    })
+    response = await handleResponse(response)
+
+    if (!response.ok) {
+      throw new Error('Error al obtener detalle de la busqueda')
+    }
+
     return response.json()
   }
 }